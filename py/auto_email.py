@@ -18,16 +18,29 @@ elif SOCKS_PORT is not None:
     raise ValueError("SOCKS_PORT must be in range 1-65535 or None")
 
 import argparse
+import atexit
+import base64
 import datetime
+import functools
 import os
 import smtplib
+import string
+import sys
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
 from dotenv import load_dotenv  # pip install python-dotenv
+from email.header import Header
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 MAX_SUBJECT_LENGTH = 50
 
-def load_config(config_env):
+EmailConfig = namedtuple("EmailConfig", ["device", "smtp_server", "port", "sender_email", 
+                                         "password", "receiver_emails"])
+
+@functools.lru_cache(maxsize=32)
+def load_config(config_env) -> EmailConfig:
+    """ Cached per `config_env`; call `load_config.cache_clear()` to re-read the file. """
     env_path = os.path.expanduser(config_env)
     if not os.path.exists(env_path):
         raise FileNotFoundError(f"{env_path} dose not exist")
@@ -41,46 +54,52 @@ def load_config(config_env):
     password = os.getenv('SENDER_PASSWORD')
     receiver_emails_str = os.getenv('RECEIVER_EMAILS') or os.getenv('RECEIVER_EMAIL')
     if receiver_emails_str:
-        receiver_emails = [email.strip() for email in receiver_emails_str.split(',')]
+        receiver_emails = tuple(email.strip() for email in receiver_emails_str.split(','))
     else:
-        receiver_emails = []
+        receiver_emails = ()
     
     # Varify required configurations
     if not all([smtp_server, sender_email, password]) or not receiver_emails:
         raise ValueError("Missing required email configuration in environment variables")
     
-    return device, smtp_server, port, sender_email, password, receiver_emails
+    return EmailConfig(device, smtp_server, port, sender_email, password, receiver_emails)
 
-def send_email(subject, content, footer="This email was sent automatically", 
-               config_env="~/my/_env/email.env", content_type="plain"):
-    device, smtp_server, port, sender_email, password, receiver_emails = load_config(config_env)
+def _clean_header(value):
+    """ Drop CR/LF so a header value can not inject extra headers. """
+    return value.replace("\r", " ").replace("\n", " ")
 
-    # Set the email header
-    full_subject = f"[{device}]" + " " + subject
-    if len(full_subject) > MAX_SUBJECT_LENGTH:
-        raise ValueError(f"Subject length exceeds {MAX_SUBJECT_LENGTH} characters")
-    
-    if content_type == "html":
-        html_content = get_html_email(full_subject, content, footer, device)
-        msg = MIMEMultipart("alternative")
-        msg.attach(MIMEText("Please use an HTML supported email client to view this email.", "plain", "utf-8"))
-        msg.attach(MIMEText(html_content, "html", "utf-8"))
-    elif content_type == "plain":
-        msg = MIMEText(content, "plain", "utf-8")
-    else:
-        raise ValueError("Unsupported content type. Use 'plain' or 'html'.")
-    
-    msg['Subject'] = full_subject
-    msg['From'] = sender_email
-    # Display the first recipient, actually sent to all
-    msg['To'] = receiver_emails[0] if receiver_emails else ""
+def _build_plain(subject, sender, to, content) -> bytes:
+    """ Hand-built equivalent of MIMEText(content, "plain", "utf-8") with headers, skipping the email package. """
+    subject = _clean_header(subject)
+    if not subject.isascii():
+        subject = Header(subject, "utf-8").encode(linesep="\r\n")
+    body = base64.encodebytes(content.encode("utf-8")).replace(b"\n", b"\r\n")
+    head = ("Content-Type: text/plain; charset=\"utf-8\"\r\n"
+            "MIME-Version: 1.0\r\n"
+            "Content-Transfer-Encoding: base64\r\n"
+            f"Subject: {subject}\r\n"
+            f"From: {_clean_header(sender)}\r\n"
+            f"To: {_clean_header(to)}\r\n"
+            "\r\n")
+    return head.encode("utf-8") + body
+
+class EmailSender:
+    """
+    Keep one logged-in SMTP connection and reuse it across sends.
+    The connection is checked with NOOP before reuse and reopened if it was dropped.
+    """
+    def __init__(self, config_env="~/my/_env/email.env"):
+        self.config_env = config_env
+        self._server = None
+
+    def __enter__(self):
+        return self
 
-    # For testing: write email to local file instead of sending
-    # with open("tmp.html", "w", encoding="utf-8") as f:
-    #     if content_type == "html": f.write(html_content)
-    # return
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
-    try:
+    def _connect(self):
+        _, smtp_server, port, sender_email, password, _ = load_config(self.config_env)
         # Select connection type based on port
         if port == 465:
             server = smtplib.SMTP_SSL(smtp_server, port)
@@ -89,85 +108,173 @@ def send_email(subject, content, footer="This email was sent automatically",
             server.starttls()  # Enable TLS for non-SSL ports
         
         server.login(sender_email, password)
-        server.sendmail(sender_email, receiver_emails, msg.as_string())
-        server.quit()
-    
-    except smtplib.SMTPAuthenticationError:
-        raise RuntimeError("Failed to authenticate with the SMTP server. "
-                          f"Please enable SMTP service on {sender_email} and change password into authorization code.")
-    except Exception as e:
-        raise RuntimeError(f"Failed to send email - {str(e)}")
+        return server
 
-def get_html_email(subject, content, footer, device=None):
-    return f"""
+    def _ensure(self):
+        if self._server is not None:
+            try:
+                if self._server.noop()[0] == 250:
+                    return self._server
+            except Exception:
+                pass
+            self.close()
+        self._server = self._connect()
+        return self._server
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+    def send(self, subject, content, footer="This email was sent automatically", content_type="plain"):
+        device, smtp_server, port, sender_email, password, receiver_emails = load_config(self.config_env)
+
+        # Set the email header
+        full_subject = f"[{device}]" + " " + subject
+        if len(full_subject) > MAX_SUBJECT_LENGTH:
+            raise ValueError(f"Subject length exceeds {MAX_SUBJECT_LENGTH} characters")
+        
+        # Display the first recipient, actually sent to all
+        to = receiver_emails[0] if receiver_emails else ""
+        if content_type == "html":
+            html_content = get_html_email(full_subject, content, footer, device)
+            msg = MIMEMultipart("alternative")
+            msg.attach(MIMEText("Please use an HTML supported email client to view this email.", "plain", "utf-8"))
+            msg.attach(MIMEText(html_content, "html", "utf-8"))
+            msg['Subject'] = full_subject
+            msg['From'] = sender_email
+            msg['To'] = to
+            message = msg.as_string()
+        elif content_type == "plain":
+            message = _build_plain(full_subject, sender_email, to, content)
+        else:
+            raise ValueError("Unsupported content type. Use 'plain' or 'html'.")
+
+        # For testing: write email to local file instead of sending
+        # with open("tmp.html", "w", encoding="utf-8") as f:
+        #     if content_type == "html": f.write(html_content)
+        # return
+
+        try:
+            self._ensure().sendmail(sender_email, receiver_emails, message)
+        
+        except smtplib.SMTPAuthenticationError:
+            self.close()
+            raise RuntimeError("Failed to authenticate with the SMTP server. "
+                              f"Please enable SMTP service on {sender_email} and change password into authorization code.")
+        except Exception as e:
+            self.close()  # Do not reuse a broken connection
+            raise RuntimeError(f"Failed to send email - {str(e)}")
+
+_senders = {}  # key: config_env, value: EmailSender; only used by the worker thread
+# A single worker sends queued emails in order over one SMTP session per config file;
+# pending emails are still sent when the interpreter exits
+_email_queue = ThreadPoolExecutor(max_workers=1, thread_name_prefix="send_email")
+
+@atexit.register
+def _close_senders():
+    for sender in _senders.values():
+        sender.close()
+
+def _send(subject, content, footer, config_env, content_type):
+    if config_env not in _senders:
+        _senders[config_env] = EmailSender(config_env)
+    _senders[config_env].send(subject, content, footer, content_type)
+
+def _report_error(future):
+    if future.exception() is not None:
+        sys.stderr.write(f"Failed to send queued email: {future.exception()}\n")
+
+def send_email(subject, content, footer="This email was sent automatically", 
+               config_env="~/my/_env/email.env", content_type="plain", blocking=False) -> Future:
+    """
+    Queue an email for the background worker and return its Future immediately.
+    With `blocking=True`, wait until it is sent and raise any error.
+    """
+    future = _email_queue.submit(_send, subject, content, footer, config_env, content_type)
+    if blocking:
+        future.result()
+    else:
+        future.add_done_callback(_report_error)
+    return future
+
+def flush_emails(timeout=None):
+    """ Wait until all queued emails have been processed. """
+    _email_queue.submit(lambda: None).result(timeout)
+
+# Parsed once at import; only the placeholders change between emails
+HTML_TEMPLATE = string.Template("""
 <!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{subject or 'Untitled'}</title>
+    <title>$title</title>
     <style>
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             line-height: 1.6;
             color: #333;
             background-color: #f5f7fa;
             margin: 0;
             padding: 20px;
-        }}
-        .email-container {{
+        }
+        .email-container {
             max-width: 600px;
             margin: 0 auto;
             background: white;
             border-radius: 5px;
             box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
             overflow: hidden;
-        }}
-        .email-header {{
+        }
+        .email-header {
             background: #e0dde9;
             color: #495057;
             padding: 15px 20px;
             border-bottom: 1px solid #e9ecef;
-        }}
-        .email-header h1 {{
+        }
+        .email-header h1 {
             margin: 0;
             font-size: 18px;
             font-weight: 600;
             text-align: left;
-        }}
-        .email-body {{
+        }
+        .email-body {
             padding: 20px;
-        }}
-        .info-item {{
+        }
+        .info-item {
             margin: 10px 0;
             padding: 8px 0;
             border-bottom: 1px solid #eee;
-        }}
-        .info-item:last-child {{
+        }
+        .info-item:last-child {
             border-bottom: none;
-        }}
-        .label {{
+        }
+        .label {
             font-weight: 600;
             color: #555;
             display: inline-block;
             width: 120px;
-        }}
-        .value {{
+        }
+        .value {
             color: #333;
-        }}
-        .error {{
+        }
+        .error {
             color: #e74c3c;
             font-weight: bold;
-        }}
-        .success {{
+        }
+        .success {
             color: #27ae60;
             font-weight: bold;
-        }}
-        .warning {{
+        }
+        .warning {
             color: #f39c12;
             font-weight: bold;
-        }}
-        code {{
+        }
+        code {
             background: #f4f4f4;
             color: #333;
             padding: 2px 4px;
@@ -175,105 +282,114 @@ def get_html_email(subject, content, footer, device=None):
             font-family: 'Courier New', monospace;
             font-size: 0.9em;
             border: 1px solid #ddd;
-        }}
-        .note {{
+        }
+        .note {
             background-color: #fff9db;
             border-left: 4px solid #ffd43b;
             padding: 15px;
             margin-top: 20px;
             border-radius: 0 4px 4px 0;
-        }}
-        .email-footer {{
+        }
+        .email-footer {
             background: #f8f9fa;
             padding: 1px 20px;
             text-align: center;
             color: #666;
             font-size: 12px;
             border-top: 1px solid #e9ecef;
-        }}
-        .timestamp {{
+        }
+        .timestamp {
             color: #999;
             font-size: 12px;
             text-align: right;
             margin-top: 20px;
-        }}
-        .table-container {{
+        }
+        .table-container {
             max-width: 100%;
             overflow-x: auto;
             margin: 15px 0;
-        }}
-        table {{
+        }
+        table {
             width: 100%;
             border-collapse: collapse;
             min-width: 500px;
-        }}
-        th {{
+        }
+        th {
             background-color: #f0ebe5;
             font-weight: 600;
             text-align: left;
             padding: 10px 12px;
             border-bottom: 2px solid #dee2e6;
-        }}
-        td {{
+        }
+        td {
             padding: 8px 12px;
             border-bottom: 1px solid #dee2e6;
             vertical-align: top;
-        }}
-        tr:nth-child(even) {{
+        }
+        tr:nth-child(even) {
             background-color: #fdfbf7;
-        }}
-        tr:hover {{
+        }
+        tr:hover {
             background-color: #e9ecef;
-        }}
-        .id-cell {{
+        }
+        .id-cell {
             min-width: 50px;
             max-width: 50px;
             word-wrap: break-word;
-        }}
-        .status-cell {{
+        }
+        .status-cell {
             min-width: 100px;
             max-width: 100px;
             word-wrap: break-word;
-        }}
-        .command-cell {{
+        }
+        .command-cell {
             min-width: 400px;
             max-width: 400px;
             word-break: break-all;
-        }}
-        .directory-cell {{
+        }
+        .directory-cell {
             min-width: 250px;
             max-width: 250px;
             word-break: break-all;
-        }}
+        }
     </style>
 </head>
 <body>
     <div class="email-container">
         <div class="email-header">
-            <h1>{subject or ''}</h1>
+            <h1>$subject</h1>
         </div>
         <div class="email-body">
             <div class="content">
-                {content or ''}
+                $content
             </div>
             <div class="timestamp">
-                Send time: {(device+' • ') if device is not None else ''}{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+                Send time: $send_time
             </div>
         </div>
         <div class="email-footer">
-            <p>{footer or ''}</p>
+            <p>$footer</p>
         </div>
     </div>
 </body>
 </html>
-"""
+""")
 
+def get_html_email(subject, content, footer, device=None):
+    send_time = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    return HTML_TEMPLATE.substitute(
+        title=subject or 'Untitled',
+        subject=subject or '',
+        content=content or '',
+        footer=footer or '',
+        send_time=((device+' • ') if device is not None else '') + send_time,
+    )
 
 def test_send():
     import time
 
     print("Sending e-mail... ", end="", flush=True)
-    send_email("Test", "This is a test email.")
+    send_email("Test", "This is a test email.", blocking=True)
     print("Done.")
 
     time.sleep(5)
@@ -281,7 +397,7 @@ def test_send():
     print("Sending e-mail... ", end="", flush=True)
     send_email("Test HTML", f"""
         <p>This is a test email with <strong>HTML</strong> content.</p>
-    """, content_type="html")
+    """, content_type="html", blocking=True)
     print("Done.")
 
 if __name__ == "__main__":
@@ -294,4 +410,4 @@ if __name__ == "__main__":
     parser.add_argument("--config-env", type=str, help="Environment variables file", default="~/my/_env/email.env")
     parser.add_argument("--content-type", type=str, help="'plain' or 'html' (default: html)", default="html")
     args = parser.parse_args()
-    send_email(args.title, args.mainbody, args.footer, args.config_env, args.content_type)
\ No newline at end of file
+    send_email(args.title, args.mainbody, args.footer, args.config_env, args.content_type, blocking=True)
\ No newline at end of file
@@ -1,7 +1,16 @@
+import atexit
+import functools
 import logging
+import os
 import sys
 import textwrap
-from typing import Tuple
+import threading
+import time
+from typing import List, Tuple
+
+@functools.lru_cache(maxsize=None)
+def _text_wrapper(width: int) -> textwrap.TextWrapper:
+    return textwrap.TextWrapper(width=width)
 
 def format_message(message: str, width=80,
                    indent_width=2, first_line_width: int=None) -> str:
@@ -22,19 +31,72 @@ def format_message(message: str, width=80,
     first_line = message[:first_line_width]
     remaining = message[first_line_width:]
     
-    result, indent = first_line, " " * indent_width
-    for line in textwrap.wrap(remaining, width = width-len(indent)):
-        result += '\n' + indent + line
-    return result
+    # Same result as textwrap.wrap, with one TextWrapper per width built once
+    indent = " " * indent_width
+    return ('\n' + indent).join([first_line] + _text_wrapper(width - indent_width).wrap(remaining))
 
 class LogDivider:
-    def __init__(self, log_file: str, width=80):
+    def __init__(self, log_file: str, width=80, batch_size=64*1024, flush_interval=1.0):
+        """
+        File writes are buffered in memory and flushed when the buffer reaches
+        `batch_size` bytes, every `flush_interval` seconds, and at exit.
+        """
         self.log_file = log_file
         self.width = width
+        # Keep one raw descriptor open for the whole run (shared with the logger's file handler);
+        # writes are already batched below, so they skip Python's buffered io layers
+        self._fd = os.open(log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        # Divider lines only depend on the width, build each of them once;
+        # cached as (str for the console, utf-8 bytes for the file)
+        self._line_cache = {c: self._encoded(c * width + "\n") for c in "-="}
+        self._word_cache = {}
+
+        self._buf: List[bytes] = []
+        self._buf_size = 0
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._lock = threading.Lock()
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+        atexit.register(self.close)
+
+    @staticmethod
+    def _encoded(text: str) -> Tuple[str, bytes]:
+        return text, text.encode("utf-8")
+
+    def _append(self, data: bytes):
+        with self._lock:
+            self._buf.append(data)
+            self._buf_size += len(data)
+            if self._buf_size >= self._batch_size:
+                self._flush()
+
+    def _flush(self):
+        """ **Should be wrapped with self._lock** """
+        if self._buf and self._fd is not None:
+            data = memoryview(b"".join(self._buf))
+            while data:
+                data = data[os.write(self._fd, data):]
+        self._buf.clear()
+        self._buf_size = 0
+
+    def _flush_loop(self):
+        while self._fd is not None:
+            time.sleep(self._flush_interval)
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
     
-    def _write(self, message: str):
-        with open(self.log_file, "a") as f:
-            f.write(message)
+    def _write(self, message: str, data: bytes = None):
+        self._append(message.encode("utf-8") if data is None else data)
         print(message, end="")
 
     def write(self, message: str, end="\n"):
@@ -44,9 +106,8 @@ class LogDivider:
         
         :param message: should **NOT** have any 'Enter'.
         """
-        with open(self.log_file, "a") as f:
-            message = format_message(message, self.width, indent_width=2)
-            f.write(message + end)
+        message = format_message(message, self.width, indent_width=2)
+        self._append((message + end).encode("utf-8"))
         print(message, end=end)
 
     def blank(self):
@@ -59,13 +120,20 @@ class LogDivider:
         """
         Single line - A line filled with `char` characters.
         """
-        self._write(char[0] * self.width + "\n")
+        line = self._line_cache.get(char[0])
+        if line is None:
+            line = self._line_cache[char[0]] = self._encoded(char[0] * self.width + "\n")
+        self._write(*line)
 
     def _word_line(self, word: str, char: str) -> str:
         """
         Single line - Centralize the word and fill the line with `char` characters.
         """
-        self._write(f" {word} ".center(self.width, char[0]) + "\n")
+        key = (word, char[0])
+        line = self._word_cache.get(key)
+        if line is None:
+            line = self._word_cache[key] = self._encoded(f" {word} ".center(self.width, char[0]) + "\n")
+        self._write(*line)
 
     def line(self):
         self._line("-")
@@ -81,8 +149,51 @@ class WrappingFormatter(logging.Formatter):
         super().__init__(fmt, datefmt)
         self.width = width
         self.start_from = start_from
+        self._last_time = (None, None, "")  # (second, datefmt, formatted)
+        # When the message comes last, the prefix can be formatted on its own
+        self._prefix_fmt = fmt[:-len("%(message)s")] if fmt.endswith("%(message)s") else None
+
+    def formatTime(self, record, datefmt=None):
+        # Records within the same second share the same date string
+        if datefmt is None:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        if self._last_time[0] != second or self._last_time[1] != datefmt:
+            self._last_time = (second, datefmt, time.strftime(datefmt, self.converter(second)))
+        return self._last_time[2]
         
     def format(self, record):
+        if self._prefix_fmt is None:
+            return self._format_split(record)
+
+        # Build the prefix alone and wrap the raw message, no need to split afterwards
+        record.message = record.getMessage()
+        if self.usesTime():
+            record.asctime = self.formatTime(record, self.datefmt)
+        prefix = self._prefix_fmt % record.__dict__
+        width, start_from = self.width, self.start_from
+        
+        first_line_width = width - len(prefix)
+        if first_line_width <= 0 or width - start_from <= 0:
+            formatted = prefix + record.message  # Not enough space for wrapping
+        else:
+            formatted = prefix + format_message(
+                record.message, width=width, 
+                indent_width=start_from, 
+                first_line_width=first_line_width
+            )
+
+        # Append traceback / stack info below the wrapped message, as logging.Formatter does
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            formatted += "\n" + record.exc_text
+        if record.stack_info:
+            formatted += "\n" + self.formatStack(record.stack_info)
+        return formatted
+
+    def _format_split(self, record):
+        """ Fallback for formats whose message is not at the end. """
         # Get the formatted message using the parent formatter
         formatted = super().format(record)
         
@@ -108,6 +219,27 @@ class WrappingFormatter(logging.Formatter):
             first_line_width=first_line_width
         )
 
+class DividerHandler(logging.Handler):
+    """
+    Write formatted records into the buffer of a LogDivider.
+    Records at or above `flush_level` flush the buffer immediately.
+    """
+    def __init__(self, divider: LogDivider, flush_level=logging.ERROR):
+        super().__init__()
+        self.divider = divider
+        self.flush_level = flush_level
+
+    def emit(self, record):
+        try:
+            self.divider._append((self.format(record) + "\n").encode("utf-8"))
+            if record.levelno >= self.flush_level:
+                self.divider.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.divider.flush()
+
 def get_logger(name: str, datefmt="%m-%d,%H:%M:%S", level=logging.INFO, 
                width=80, start_from=30) -> Tuple[logging.Logger, LogDivider]:
     """
@@ -131,7 +263,8 @@ def get_logger(name: str, datefmt="%m-%d,%H:%M:%S", level=logging.INFO,
         start_from=start_from
     )
 
-    file_handler = logging.FileHandler(log_divider.log_file, mode="a", encoding="utf-8")
+    # Write through the divider's buffer instead of opening the same file twice
+    file_handler = DividerHandler(log_divider)
     file_handler.setLevel(level)
     file_handler.setFormatter(formatter)
 
@@ -1,4 +1,6 @@
+import sys
 from enum import Enum
+from functools import wraps
 
 class ExecutionStatus(Enum):
     error = "ERROR"
@@ -6,25 +8,29 @@ class ExecutionStatus(Enum):
 
 def try_except(throw_status, print_error=True):
     def inner(func):
-    
+        status_str = throw_status.value  # Resolve once, not on every failure
+
+        @wraps(func)
         def wrapper(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
             except Exception as e:
                 if print_error:
-                    print(f"{throw_status.value}: {e}")
+                    sys.stderr.write(f"{status_str}: {e}\n")
                 return throw_status
         return wrapper
-    
+
     return inner
 
 def interrupt_continue(func):
     throw_status = ExecutionStatus.warning
-    
+    message = f"{throw_status.value}: KeyboardInterrupt\n"
+
+    @wraps(func)
     def wrapper(*args, **kwargs):
         try:
             return func(*args, **kwargs)
         except KeyboardInterrupt:
-            print(f"{throw_status.value}: KeyboardInterrupt")
+            sys.stderr.write(message)
             return throw_status
     return wrapper
\ No newline at end of file
@@ -8,11 +8,93 @@ data = {
         'layer3_2': NoIndent({'x': 1, 'y': 2, 'z': 3})
     }
 }
-json.dumps(data, indent=4, cls=MyJSONEncoder) '''
+json.dumps(data, indent=4, cls=MyJSONEncoder)
+with open("data.json", "wb") as f:
+    MyJSONEncoder.dump_to(f, data, indent=4)
+
+NoIndent values are written on a single line with compact separators (',' and
+':'), with orjson when it is installed, otherwise with the standard json module.
+Both give the same text: NaN/Infinity, `ensure_ascii` escapes and exponents are
+written as the json module writes them, falling back to it where orjson differs.
+With orjson, dataclasses, datetimes and numpy arrays are serialized natively
+(on a single line) instead of raising TypeError. '''
 from _ctypes import PyObj_FromPtr
+import dataclasses
 import json
+import math
 import re
 
+_FORMAT_SPEC = '@@{}@@'
+_ID_REGEX = re.compile('"{}"'.format(_FORMAT_SPEC.format(r'(\d+)')))  # Quoted NoIndent marker
+# A number orjson writes with an exponent ("1e16"), where json writes "1e+16";
+# may also match inside a string, which only costs a re-emit with json
+_EXPONENT_REGEX = re.compile(rb'\de')
+COMPACT_SEPARATORS = (',', ':')
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # fall back to the standard json module
+    orjson = None
+
+
+def _orjson_option(sort_keys=False) -> int:
+    return orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+
+
+def _has_non_finite(value) -> bool:
+    """ Whether `value` holds a NaN or ±Infinity anywhere; orjson writes them as null. """
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_non_finite(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_non_finite(v) for v in value)
+    if isinstance(value, NoIndent):
+        return _has_non_finite(value.value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return any(_has_non_finite(getattr(value, f.name)) for f in dataclasses.fields(value))
+    dtype = getattr(value, "dtype", None)  # numpy array or scalar
+    if dtype is not None and dtype.kind in "fc":
+        return bool((value != value).any() or (abs(value) == math.inf).any())
+    return False
+
+
+def _orjson_text(value, sort_keys=False, ensure_ascii=True):
+    """
+    Serialize `value` on a single line with orjson, giving the same text as
+    json.dumps with compact separators. Return None if orjson is not installed
+    or cannot keep the value intact (non-str keys, NaN/Infinity, ...).
+    """
+    if orjson is None:
+        return None
+    try:
+        data = orjson.dumps(value, option=_orjson_option(sort_keys))
+    except TypeError:  # e.g. non-str keys, unsupported types
+        return None
+    if b"null" in data and _has_non_finite(value):
+        return None
+    text = data.decode("utf-8")
+    if (ensure_ascii and not data.isascii()) or _EXPONENT_REGEX.search(data):
+        # json escapes non-ASCII characters as \uXXXX and writes exponents as "1e+16"
+        text = json.dumps(json.loads(text), ensure_ascii=ensure_ascii, separators=COMPACT_SEPARATORS)
+    return text
+
+
+def _compact_dumps(value, sort_keys=False, ensure_ascii=True, allow_nan=True) -> str:
+    """ Serialize a NoIndent value on a single line. """
+    text = _orjson_text(value, sort_keys, ensure_ascii)
+    if text is None:
+        text = json.dumps(value, sort_keys=sort_keys, ensure_ascii=ensure_ascii,
+                          allow_nan=allow_nan, separators=COMPACT_SEPARATORS)
+    return text
+
+
+def _unwrap_no_indent(obj):
+    """ orjson `default` hook: serialize NoIndent as its wrapped value. """
+    if isinstance(obj, NoIndent):
+        return obj.value
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
 
 class NoIndent(object):
     """ Value wrapper. """
@@ -20,34 +102,90 @@ class NoIndent(object):
         self.value = value
 
 class MyJSONEncoder(json.JSONEncoder):
-    FORMAT_SPEC = '@@{}@@'
-    regex = re.compile(FORMAT_SPEC.format(r'(\d+)'))
+    FORMAT_SPEC = _FORMAT_SPEC
+    regex = _ID_REGEX
 
     def __init__(self, **kwargs):
         # Save copy of any keyword argument values needed for use here.
         self.__sort_keys = kwargs.get('sort_keys', None)
+        self._fragments = {}  # key: id(obj), value: (obj, JSON text) serialized by orjson
         super(MyJSONEncoder, self).__init__(**kwargs)
 
     def default(self, obj):
-        return (self.FORMAT_SPEC.format(id(obj)) if isinstance(obj, NoIndent)
-                else super(MyJSONEncoder, self).default(obj))
+        if isinstance(obj, NoIndent):
+            return self.FORMAT_SPEC.format(id(obj))
+        # dataclass, datetime, numpy, ...; not if it holds NaN/Infinity, which orjson cannot write
+        text = _orjson_text(obj, self.__sort_keys, self.ensure_ascii)
+        if text is not None:
+            self._fragments[id(obj)] = (obj, text)  # Keep obj alive so its id stays unique
+            return self.FORMAT_SPEC.format(id(obj))
+        return super(MyJSONEncoder, self).default(obj)
 
     def encode(self, obj):
-        format_spec = self.FORMAT_SPEC  # Local var to expedite access.
+        self._fragments = {}
         json_repr = super(MyJSONEncoder, self).encode(obj)  # Default JSON.
+        sort_keys, from_ptr, dumps, fragments = self.__sort_keys, PyObj_FromPtr, _compact_dumps, self._fragments
+        ensure_ascii, allow_nan = self.ensure_ascii, self.allow_nan
 
-        # Replace any marked-up object ids in the JSON repr with the
-        # value returned from the json.dumps() of the corresponding
-        # wrapped Python object.
-        for match in self.regex.finditer(json_repr):
+        # Replace every marked-up object id (with its quotes) in the JSON repr
+        # with the json.dumps() of the corresponding wrapped Python object,
+        # in a single pass over the string.
+        def _replace(match):
             # see https://stackoverflow.com/a/15012814/355230
-            id = int(match.group(1))
-            no_indent = PyObj_FromPtr(id)
-            json_obj_repr = json.dumps(no_indent.value, sort_keys=self.__sort_keys)
+            obj_id = int(match.group(1))
+            if obj_id in fragments:
+                return fragments[obj_id][1]
+            no_indent = from_ptr(obj_id)
+            return dumps(no_indent.value, sort_keys=sort_keys, ensure_ascii=ensure_ascii, allow_nan=allow_nan)
+
+        return _ID_REGEX.sub(_replace, json_repr)
+
+    @classmethod
+    def dumps_bytes(cls, obj, **kwargs) -> bytes:
+        """
+        Serialize `obj` to UTF-8 bytes, as `cls(**kwargs).encode(obj)` would.
+        With `separators=COMPACT_SEPARATORS` and no `indent`, orjson produces the
+        bytes directly when installed and its output is the same as json's.
+        """
+        if (orjson is not None and kwargs.get("indent") is None
+                and set(kwargs) <= {"indent", "sort_keys", "separators", "ensure_ascii", "allow_nan"}
+                and tuple(kwargs.get("separators") or ()) == COMPACT_SEPARATORS):
+            try:
+                data = orjson.dumps(obj, default=_unwrap_no_indent,
+                                    option=_orjson_option(kwargs.get("sort_keys")))
+            except TypeError:
+                pass
+            else:
+                if not ((kwargs.get("ensure_ascii", True) and not data.isascii())
+                        or _EXPONENT_REGEX.search(data)
+                        or (b"null" in data and _has_non_finite(obj))):
+                    return data
+        return cls(**kwargs).encode(obj).encode("utf-8")
+
+    @classmethod
+    def dump_to(cls, fp, obj, **kwargs):
+        """ Write `obj` to a file opened in binary mode. """
+        fp.write(cls.dumps_bytes(obj, **kwargs))
 
-            # Replace the matched id string with json formatted representation
-            # of the corresponding Python object.
-            json_repr = json_repr.replace(
-                            '"{}"'.format(format_spec.format(id)), json_obj_repr)
 
-        return json_repr
\ No newline at end of file
+if __name__ == "__main__":
+    # Pin the output of both paths: with orjson (if installed) and with the json module only
+    _orjson = orjson
+    for orjson in dict.fromkeys([_orjson, None]):
+        data = {'a': NoIndent([1.5, float('nan'), 'é']), 'b': NoIndent({'x': 1e16, 'y': None})}
+        assert json.dumps(data, cls=MyJSONEncoder, indent=2) == \
+            '{\n  "a": [1.5,NaN,"\\u00e9"],\n  "b": {"x":1e+16,"y":null}\n}'
+        assert json.dumps(data, cls=MyJSONEncoder, indent=2, ensure_ascii=False) == \
+            '{\n  "a": [1.5,NaN,"é"],\n  "b": {"x":1e+16,"y":null}\n}'
+        try:
+            json.dumps({'a': NoIndent([float('inf')])}, cls=MyJSONEncoder, allow_nan=False)
+            raise AssertionError("allow_nan=False should reject Infinity")
+        except ValueError:
+            pass
+        inf = {'x': float('inf'), 's': 'é'}
+        assert MyJSONEncoder.dumps_bytes(inf) == b'{"x": Infinity, "s": "\\u00e9"}'
+        assert MyJSONEncoder.dumps_bytes(inf, separators=COMPACT_SEPARATORS) == b'{"x":Infinity,"s":"\\u00e9"}'
+        assert MyJSONEncoder.dumps_bytes({'s': 'é', 'k': 1e16}, separators=COMPACT_SEPARATORS,
+                                         ensure_ascii=False) == '{"s":"é","k":1e+16}'.encode("utf-8")
+        assert MyJSONEncoder.dumps_bytes({'a': NoIndent([1, 2])}, separators=COMPACT_SEPARATORS) == b'{"a":[1,2]}'
+        print(f"ok ({'orjson' if orjson is not None else 'json'})")
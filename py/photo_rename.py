@@ -5,6 +5,7 @@ Rename photos/videos to "YYYY-MM-DD HHMMSS.ext" based on capture time.
 - Videos (MOV/MP4): QuickTime/MP4 creation_time (UTC) -> converted to target UTC offset
 - Optional fallback: file mtime
 - If a name collides, increment by +1 second until unique
+- ffprobe results are cached in ".photo_rename_cache.json" per directory (disable with --no-cache)
 
 Requirements:
   pip install "exifread<3"   # for JPG/HEIC EXIF
@@ -13,53 +14,96 @@ Requirements:
 
 from __future__ import annotations
 import argparse
+import atexit
+import functools
+import json
 import os
-import re
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import Optional, Iterable, Tuple
-
-try:
-    import exifread  # type: ignore
-except ImportError:  # allow running --videos-only without exifread
-    exifread = None  # noqa: N816
-
+from typing import Dict, Optional, Iterable, List, Set, Tuple
 
 IMAGE_EXTS = {".JPG", ".JPEG", ".HEIC"}
 VIDEO_EXTS = {".MOV", ".MP4"}
+ALL_EXTS = IMAGE_EXTS | VIDEO_EXTS
 
-NAME_RE = re.compile(r"^\d{4}-\d{2}-\d{2} \d{6}\.[A-Za-z0-9]+$")
+CACHE_NAME = ".photo_rename_cache.json"
+_probe_cache: Dict[Path, Dict[str, str]] = {}  # directory -> {"name:size:mtime_ns": ISO creation time}
+_probe_cache_dirty = set()
+_probe_cache_lock = threading.Lock()
+use_probe_cache = True
 
+LOCAL_TZ = datetime.now().astimezone().tzinfo  # System local timezone, resolved once per run
 
-def iter_files(root: Path, recursive: bool) -> Iterable[Path]:
-    globber = root.rglob if recursive else root.glob
-    for p in globber("*"):
-        if not p.is_file():
-            continue
-        ext = p.suffix.upper()
-        if ext in IMAGE_EXTS | VIDEO_EXTS:
-            yield p
+
+def iter_files(root: Path, recursive: bool) -> Iterable[Tuple[Path, str, os.DirEntry]]:
+    """ Yields (path, upper-case suffix, scandir entry) of media files """
+    # scandir entries know their own type, so no extra stat per file is needed
+    try:
+        it = os.scandir(root)
+    except PermissionError:
+        return
+    with it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if recursive:
+                    yield from iter_files(Path(entry.path), recursive)
+                continue
+            ext = os.path.splitext(entry.name)[1].upper()
+            if ext in ALL_EXTS and entry.is_file():
+                yield Path(entry.path), ext, entry
 
 
 # ---------- Time extraction ----------
 
+@functools.lru_cache(maxsize=None)
+def load_exifread():
+    # Imported on first use so runs without images do not pay for it
+    try:
+        import exifread  # type: ignore
+    except ImportError:  # allow running --videos-only without exifread
+        return None
+    return exifread
+
+
+def parse_fixed_datetime(s: str, date_seps: str = ":-/") -> Optional[datetime]:
+    # Fast path for "YYYY?MM?DD HH:MM:SS" (? is one of date_seps): slice instead of strptime
+    if len(s) != 19 or s[4] not in date_seps or s[7] != s[4] or s[10] != " " or s[13] != ":" or s[16] != ":":
+        return None
+    digits = s[0:4] + s[5:7] + s[8:10] + s[11:13] + s[14:16] + s[17:19]
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+    try:
+        return datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]), int(s[11:13]), int(s[14:16]), int(s[17:19]))
+    except ValueError:  # e.g. month 13
+        return None
+
+
 def parse_exif_datetime_string(s: str) -> Optional[datetime]:
     # EXIF is typically "YYYY:MM:DD HH:MM:SS"
+    s = s.strip()
+    dt = parse_fixed_datetime(s, ":-")
+    if dt:
+        return dt
     for fmt in ("%Y:%m:%d %H:%M:%S", "%Y-%m-%d %H:%M:%S"):
         try:
-            return datetime.strptime(s.strip(), fmt)
+            return datetime.strptime(s, fmt)
         except ValueError:
             pass
     return None
 
 
 def get_image_time_exif(path: Path) -> Optional[datetime]:
+    exifread = load_exifread()
     if exifread is None:
         return None
     try:
-        with path.open("rb") as f:
-            tags = exifread.process_file(f, details=False)
+        # Only the header is read; stop once DateTimeOriginal is decoded. IFD0 (Image DateTime) comes
+        # before it, and DateTimeDigitized is only needed when DateTimeOriginal is missing anyway
+        with path.open("rb", buffering=64 * 1024) as f:
+            tags = exifread.process_file(f, details=False, stop_tag="DateTimeOriginal")
         for key in ("EXIF DateTimeOriginal", "EXIF DateTimeDigitized", "Image DateTime"):
             if key in tags:
                 s = tags[key].printable
@@ -71,17 +115,95 @@ def get_image_time_exif(path: Path) -> Optional[datetime]:
     return None
 
 
-def run_ffprobe(path: Path) -> list[str]:
-    # Query both container- and stream-level tags + Apple QuickTime tag
+# ---------- ffprobe cache ----------
+
+def _load_probe_cache(directory: Path) -> Dict[str, str]:
+    """ **Should be wrapped with _probe_cache_lock** """
+    entries = _probe_cache.get(directory)
+    if entries is None:
+        try:
+            with open(directory / CACHE_NAME, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+        _probe_cache[directory] = entries
+    return entries
+
+
+def save_probe_cache():
+    with _probe_cache_lock:
+        for directory in _probe_cache_dirty:
+            entries = _probe_cache[directory]
+            try:
+                # Drop entries of files that were removed since they were cached
+                # (renamed ones were re-keyed by move_probe_cache_entry)
+                names = set(os.listdir(directory))
+                entries = {k: v for k, v in entries.items() if k.rsplit(":", 2)[0] in names}
+                with open(directory / CACHE_NAME, "w", encoding="utf-8") as f:
+                    json.dump(entries, f, indent=1)
+            except OSError as e:
+                print(f"[WARN] Failed to save {directory / CACHE_NAME}: {e}")
+        _probe_cache_dirty.clear()
+
+
+def move_probe_cache_entry(src: Path, dst: Path, entry: Optional[os.DirEntry] = None):
+    """ Re-key the cached time of `src` to `dst` after a rename, which keeps size and mtime. """
+    if not use_probe_cache:
+        return
+    try:
+        st = (entry or dst).stat()  # DirEntry caches the stat result taken before the rename
+    except OSError:
+        return
+    suffix = f":{st.st_size}:{st.st_mtime_ns}"
+    with _probe_cache_lock:
+        entries = _probe_cache.get(src.parent)
+        if entries is None:
+            return
+        cached = entries.pop(src.name + suffix, None)
+        if cached is not None:
+            entries[dst.name + suffix] = cached
+            _probe_cache_dirty.add(src.parent)
+
+
+def cached_probe(func):
+    """
+    Cache a path -> Optional[datetime] function on disk, keyed by file name, size and mtime.
+    Only found times are cached, so files without one are probed again next run.
+    """
+    @functools.wraps(func)
+    def wrapper(path: Path, entry: Optional[os.DirEntry] = None) -> Optional[datetime]:
+        if not use_probe_cache:
+            return func(path)
+        try:
+            st = (entry or path).stat()  # DirEntry caches its stat result
+        except OSError:
+            return func(path)
+        key = f"{path.name}:{st.st_size}:{st.st_mtime_ns}"
+        with _probe_cache_lock:
+            cached = _load_probe_cache(path.parent).get(key)
+        if cached is not None:
+            return datetime.fromisoformat(cached)
+
+        dt = func(path)
+        if dt is not None:
+            with _probe_cache_lock:
+                _load_probe_cache(path.parent)[key] = dt.isoformat()
+                _probe_cache_dirty.add(path.parent)
+        return dt
+    return wrapper
+
+
+def run_ffprobe(path: Path) -> dict:
+    # Query both container- and stream-level tags + Apple QuickTime tag, as labelled JSON
     cmd = [
         "ffprobe", "-v", "quiet", "-hide_banner",  # Silence harmless QuickTime warning
         "-show_entries",
-        "format_tags=creation_time:stream_tags=creation_time:format_tags=com.apple.quicktime.creationdate",
-        "-of", "default=nw=1:nk=1",
+        "format_tags=creation_time,com.apple.quicktime.creationdate:stream_tags=creation_time",
+        "-of", "json",
         str(path),
     ]
     out = subprocess.check_output(cmd, text=True, errors="ignore")
-    return [ln.strip() for ln in out.splitlines() if ln.strip()]
+    return json.loads(out or "{}")
 
 
 def try_parse_iso_z(s: str) -> Optional[datetime]:
@@ -97,6 +219,14 @@ def try_parse_iso_z(s: str) -> Optional[datetime]:
 
 
 def try_parse_quicktime_local(s: str) -> Optional[datetime]:
+    # Fast paths for the common shapes, strptime below handles the rest
+    dt = parse_fixed_datetime(s[:19], "-/")
+    if dt:
+        if len(s) == 19:
+            return dt  # naive
+        if len(s) == 25 and s[19] == " " and s[20] in "+-" and s[21:25].isdigit():
+            offset = timedelta(hours=int(s[21:23]), minutes=int(s[23:25]))
+            return dt.replace(tzinfo=timezone(-offset if s[20] == "-" else offset))  # aware
     # e.g., "2021-07-15 12:35:11" (no tz)
     for fmt in ("%Y-%m-%d %H:%M:%S", "%Y/%m/%d %H:%M:%S"):
         try:
@@ -118,34 +248,44 @@ def try_parse_quicktime_local(s: str) -> Optional[datetime]:
     return None
 
 
+@cached_probe
 def get_video_time_ffprobe(path: Path) -> Optional[datetime]:
     try:
-        lines = run_ffprobe(path)
+        data = run_ffprobe(path)
     except Exception:
         return None
 
-    for s in lines:
-        # Try ISO first (e.g., 2021-07-15T12:35:11.000000Z)
-        dt = try_parse_iso_z(s)
-        if dt:
-            return dt
-        # Try QuickTime variants
-        dt = try_parse_quicktime_local(s)
+    # creation_time is always ISO 8601 (e.g., 2021-07-15T12:35:11.000000Z)
+    format_tags = data.get("format", {}).get("tags", {})
+    for tags in [format_tags] + [st.get("tags", {}) for st in data.get("streams", [])]:
+        s = tags.get("creation_time", "").strip()
+        dt = s and try_parse_iso_z(s)
         if dt:
             return dt
+    # The Apple tag may also come in QuickTime variants
+    s = format_tags.get("com.apple.quicktime.creationdate", "").strip()
+    if s:
+        return try_parse_iso_z(s) or try_parse_quicktime_local(s)
     return None
 
 
-def get_capture_time(path: Path, *, prefer_mtime: bool = False, taken_utc_offset: int = 0, target_utc_offset: int = 0) -> Tuple[Optional[datetime], str]:
+@functools.lru_cache(maxsize=None)
+def utc_offset_tz(hours: int) -> timezone:
+    return timezone(timedelta(hours=hours))
+
+
+def get_capture_time(path: Path, *, prefer_mtime: bool = False, taken_utc_offset: int = 0, target_utc_offset: int = 0,
+                     entry: Optional[os.DirEntry] = None) -> Tuple[Optional[datetime], str]:
     """
     Returns (datetime, source)
     - For images: EXIF naive datetime -> interpret as taken_utc_offset timezone -> convert to target_utc_offset
     - For videos: creation_time (UTC) -> convert to target_utc_offset
     - If prefer_mtime: use file mtime (local) -> convert to target_utc_offset
+    - entry: scandir entry of `path`, to share one stat() between the steps above
     """
     ext = path.suffix.upper()
-    taken_tz = timezone(timedelta(hours=taken_utc_offset))
-    target_tz = timezone(timedelta(hours=target_utc_offset))
+    taken_tz = utc_offset_tz(taken_utc_offset)
+    target_tz = utc_offset_tz(target_utc_offset)
     
     # 1) primary metadata
     if ext in IMAGE_EXTS:
@@ -155,7 +295,7 @@ def get_capture_time(path: Path, *, prefer_mtime: bool = False, taken_utc_offset
             dt_aware = dt.replace(tzinfo=taken_tz)
             return dt_aware.astimezone(target_tz), "exif"
     elif ext in VIDEO_EXTS:
-        dt = get_video_time_ffprobe(path)
+        dt = get_video_time_ffprobe(path, entry)
         if dt:
             # Video datetime is typically UTC, convert to target UTC offset
             if dt.tzinfo is None:
@@ -165,12 +305,10 @@ def get_capture_time(path: Path, *, prefer_mtime: bool = False, taken_utc_offset
     # 2) fallback: mtime
     if prefer_mtime:
         try:
-            ts = path.stat().st_mtime
+            ts = (entry or path).stat().st_mtime
             # mtime is in local timezone, convert to target UTC offset
             local_dt = datetime.fromtimestamp(ts)
-            # Get system local timezone
-            local_tz = datetime.now().astimezone().tzinfo
-            local_dt_aware = local_dt.replace(tzinfo=local_tz)
+            local_dt_aware = local_dt.replace(tzinfo=LOCAL_TZ)
             return local_dt_aware.astimezone(target_tz), "mtime"
         except Exception:
             pass
@@ -178,34 +316,63 @@ def get_capture_time(path: Path, *, prefer_mtime: bool = False, taken_utc_offset
     return None, "none"
 
 
+def get_capture_times(files: List[Tuple[Path, os.DirEntry]], jobs: int, **kwargs) -> List[Tuple[Optional[datetime], str]]:
+    """
+    get_capture_time() for every (path, entry), `jobs` at a time; results keep the order of `files`.
+    Threads are enough: the time goes to waiting on ffprobe and reading file headers.
+    """
+    # Submit videos first: their ffprobe startup then overlaps with the EXIF reads of the images
+    order = sorted(range(len(files)), key=lambda i: files[i][0].suffix.upper() not in VIDEO_EXTS)
+    with ThreadPoolExecutor(max_workers=jobs) as ex:
+        futures = {i: ex.submit(get_capture_time, files[i][0], entry=files[i][1], **kwargs) for i in order}
+        return [futures[i].result() for i in range(len(files))]
+
+
 # ---------- Renaming ----------
 
 def fmt_target_name(dt: datetime, ext: str) -> str:
-    # Strip timezone info for filename (we want just the clock time in target timezone)
-    dt_naive = dt.replace(tzinfo=None)
-    return dt_naive.strftime("%Y-%m-%d %H%M%S") + ext.upper()
+    # Just the clock time in target timezone; f-string instead of the locale-aware strftime
+    return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}{dt.minute:02d}{dt.second:02d}{ext.upper()}"
 
 
 def is_already_named(p: Path) -> bool:
-    return NAME_RE.match(p.name) is not None
+    # "YYYY-MM-DD HHMMSS.ext" checked by position, no regex needed for a fixed shape
+    name = p.name
+    if len(name) < 19 or name[4] != "-" or name[7] != "-" or name[10] != " " or name[17] != ".":
+        return False
+    ext = name[18:]
+    return (name[:4] + name[5:7] + name[8:10] + name[11:17]).isdecimal() and ext.isascii() and ext.isalnum()
 
 
-def resolve_collision(dst_dir: Path, base_dt: datetime, ext: str) -> Tuple[datetime, Path]:
+def resolve_collision(dst_dir: Path, base_dt: datetime, ext: str, taken: Optional[Set[str]] = None) -> Tuple[datetime, Path]:
+    """
+    `taken`: casefolded names already in `dst_dir`; checked instead of one stat per candidate.
+    Casefolded, so a case-insensitive filesystem (APFS, NTFS, ...) cannot overwrite "x.jpg" with "x.JPG"
+    """
     dt = base_dt
     while True:
-        candidate = dst_dir / fmt_target_name(dt, ext)
-        if not candidate.exists():
-            return dt, candidate
+        name = fmt_target_name(dt, ext)
+        exists = name.casefold() in taken if taken is not None else (dst_dir / name).exists()
+        if not exists:
+            return dt, dst_dir / name
         dt = dt + timedelta(seconds=1)
 
 
-def rename_one(p: Path, *, use_mtime_fallback: bool, taken_utc_offset: int, target_utc_offset: int) -> Tuple[bool, str, Optional[Path]]:
-    dt, src = get_capture_time(p, prefer_mtime=use_mtime_fallback, taken_utc_offset=taken_utc_offset, target_utc_offset=target_utc_offset)
+def rename_one(p: Path, *, use_mtime_fallback: bool, taken_utc_offset: int, target_utc_offset: int,
+               captured: Optional[Tuple[Optional[datetime], str]] = None,
+               taken: Optional[Set[str]] = None) -> Tuple[bool, str, Optional[Path]]:
+    """
+    `captured`: result of get_capture_time() for `p` if already known
+    `taken`: casefolded names already in the directory of `p`, see resolve_collision()
+    """
+    if captured is None:
+        captured = get_capture_time(p, prefer_mtime=use_mtime_fallback, taken_utc_offset=taken_utc_offset, target_utc_offset=target_utc_offset)
+    dt, src = captured
     if dt is None:
         return False, f"[SKIP] No datetime for {p}", None
 
     dst_dir = p.parent
-    dt, dst_path = resolve_collision(dst_dir, dt, p.suffix)
+    dt, dst_path = resolve_collision(dst_dir, dt, p.suffix, taken)
     
     # Format UTC offsets for display
     ext = p.suffix.upper()
@@ -230,12 +397,18 @@ def main():
     ap.add_argument("--use-mtime-fallback", action="store_true", help="If metadata missing, use file mtime")
     ap.add_argument("--videos-only", action="store_true", help="Process only videos (MOV/MP4)")
     ap.add_argument("--images-only", action="store_true", help="Process only images (JPG/HEIC)")
-    ap.add_argument("--skip-already-named", action="store_true", help="Skip files already in target name pattern")
+    ap.add_argument("--skip-already-named", action="store_true",
+                    help="Skip files already in target name pattern (default; kept for compatibility)")
+    ap.add_argument("--reprobe-existing", action="store_true",
+                    help="Also read metadata of files already in target name pattern and rename them if needed")
     ap.add_argument("--keep-tree", action="store_true", help="Keep files in place (default).")
     ap.add_argument("--taken-UTC", type=int, default=8, metavar="OFFSET",
                     help="UTC offset for EXIF photo timestamps (e.g., --taken-UTC 8 if photos taken in UTC+8). Default: 8 (UTC)")
     ap.add_argument("--target-UTC", type=int, default=8, metavar="OFFSET", 
                     help="Target UTC offset for output filenames (e.g., --target-UTC 8 for UTC+8 times). Default: 8 (UTC)")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                    help="Number of files to read metadata from at once (use ~2 on HDDs). Default: CPU count")
+    ap.add_argument("--no-cache", action="store_true", help=f"Do not read or write {CACHE_NAME} files")
     args = ap.parse_args()
 
     root = args.directory.expanduser().resolve()
@@ -249,11 +422,16 @@ def main():
             print(f"[ERROR] {name} offset must be between -12 and +14, got: {offset}")
             raise SystemExit(2)
 
+    global use_probe_cache
+    use_probe_cache = not args.no_cache
+    if use_probe_cache and not args.dry_run:  # A dry run reads the cache but leaves no file behind
+        atexit.register(save_probe_cache)
+
     files = list(iter_files(root, args.recursive))
     if args.videos_only:
-        files = [p for p in files if p.suffix.upper() in VIDEO_EXTS]
+        files = [f for f in files if f[1] in VIDEO_EXTS]
     if args.images_only:
-        files = [p for p in files if p.suffix.upper() in IMAGE_EXTS]
+        files = [f for f in files if f[1] in IMAGE_EXTS]
 
     if not files:
         print("[INFO] No media files found.")
@@ -269,17 +447,37 @@ def main():
     skipped = 0
     failed = 0
 
-    for p in sorted(files):
-        if args.skip_already_named and is_already_named(p):
+    todo = []
+    # Sorted by plain path string: cheaper than comparing Path objects, and keeps collision
+    # suffixes (+1s) stable between runs
+    for p, _, entry in sorted(files, key=lambda f: str(f[0])):
+        if not args.reprobe_existing and is_already_named(p):
             print(f"[SKIP] Already named: {p.name}")
             skipped += 1
             continue
-
+        todo.append((p, entry))
+
+    # Read capture times in parallel; resolve collisions and rename one by one
+    times = dict(zip([p for p, _ in todo], get_capture_times(
+        todo,
+        max(args.jobs, 1),
+        prefer_mtime=args.use_mtime_fallback,
+        taken_utc_offset=args.taken_UTC,
+        target_utc_offset=args.target_UTC,
+    )))
+
+    taken_names: Dict[Path, Set[str]] = {}  # directory -> casefolded names in it, listed once
+    for p, entry in todo:
+        taken = taken_names.get(p.parent)
+        if taken is None:
+            taken = taken_names[p.parent] = {name.casefold() for name in os.listdir(p.parent)}
         ok, msg, dst = rename_one(
             p,
             use_mtime_fallback=args.use_mtime_fallback,
             taken_utc_offset=args.taken_UTC,
             target_utc_offset=args.target_UTC,
+            captured=times[p],
+            taken=taken,
         )
         print(msg)
         if not ok:
@@ -292,6 +490,9 @@ def main():
 
         try:
             p.rename(dst)  # in-place rename
+            move_probe_cache_entry(p, dst, entry)
+            taken.discard(p.name.casefold())
+            taken.add(dst.name.casefold())
             renamed += 1
         except Exception as e:
             print(f"[ERROR] Rename failed for {p}: {e}")
@@ -5,52 +5,224 @@
 import argparse
 import fnmatch
 import hashlib
-import logging
 import os
 import re
 import stat
 import shutil
+import sys
 import time
 from datetime import datetime
 from typing import List, Optional, Tuple
 
+try:
+    import blake3  # 可选依赖, 比 MD5 快得多
+except ImportError:
+    blake3 = None
+
+
+if os.sep == "/":
+    def _norm(path: str) -> str:
+        """统一路径分隔符为 "/"; POSIX 下已是 "/", 原样返回"""
+        return path
+else:
+    def _norm(path: str) -> str:
+        """统一路径分隔符为 "/" (兼容Windows路径)"""
+        return path.replace("\\", "/")
+
+
+# 等价于在 _norm(path) 中查找 ".git/objects/"，Windows 下直接匹配两种分隔符，无需复制路径
+GIT_OBJECTS_RE = re.compile(r"\.git/objects/" if os.sep == "/" else r"\.git[\\/]objects[\\/]")
+
+
+def _in_git_objects(path: str) -> bool:
+    """判断路径是否位于 .git/objects/ 下; 不含 ".git" 的路径 (绝大多数) 只需一次子串查找"""
+    return ".git" in path and GIT_OBJECTS_RE.search(path) is not None
+
+
+FICLONE = 0x40049409  # Linux ioctl: 在 Btrfs/XFS 等写时复制文件系统上创建 reflink
+DROP_CACHE_THRESHOLD = 32 * 1024 * 1024  # 复制超过该大小的文件后丢弃其页缓存
+
+
+def _kernel_copy(src: str, dst: str, size: int) -> bool:
+    """
+    Linux 下在内核内复制文件内容: 先尝试 FICLONE (reflink, 与大小无关), 再用 copy_file_range
+    :return: True - 复制成功, False - 不支持，需回退到 shutil.copyfile
+    """
+    fd_in = os.open(src, os.O_RDONLY)
+    try:
+        fd_out = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            try:
+                import fcntl
+                fcntl.ioctl(fd_out, FICLONE, fd_in)
+                return True
+            except (ImportError, OSError):
+                pass
+            # 复制到源文件末尾 (copy_file_range 返回 0) 为止，不以 size 为准: 遍历后源文件可能已变长
+            # size 只用于决定是否丢弃页缓存
+            chunk = max(size, 1 << 20)
+            while os.copy_file_range(fd_in, fd_out, chunk):
+                pass
+            if size > DROP_CACHE_THRESHOLD and hasattr(os, "posix_fadvise"):
+                # 大文件复制后不会再读取，丢弃其页缓存，避免挤掉其它进程与目录元数据的缓存
+                try:
+                    os.posix_fadvise(fd_in, 0, 0, os.POSIX_FADV_DONTNEED)
+                    os.posix_fadvise(fd_out, 0, 0, os.POSIX_FADV_DONTNEED)
+                except OSError:
+                    pass
+            return True
+        except OSError:
+            return False  # 跨文件系统 (旧内核)、文件系统不支持等
+        finally:
+            os.close(fd_out)
+    finally:
+        os.close(fd_in)
+
+
+def _copy_file(src: str, dst: str, src_st: Optional[os.stat_result] = None):
+    """
+    复制文件内容与元数据, 等价于 shutil.copy2(src, dst)
+    :param src_st: 调用方已有的源文件 stat 结果 (如 DirEntry.stat()), 传入后不再 stat
+    """
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))  # 与 copy2 相同, 复制到目录内
+    if hasattr(os, "copy_file_range"):
+        # 小文件同样走内核复制: 省去用户态缓冲区的来回拷贝, CoW 文件系统上直接 reflink
+        if src_st is None:
+            src_st = os.stat(src)
+        # 只复制普通文件: 命名管道等特殊文件交给 shutil.copyfile 报错，os.open 会一直阻塞
+        if stat.S_ISREG(src_st.st_mode) and _kernel_copy(src, dst, src_st.st_size):
+            shutil.copystat(src, dst)
+            return
+    shutil.copyfile(src, dst)  # 在 Linux 上内部使用 os.sendfile，其余平台为分块读写
+    shutil.copystat(src, dst)
+
+
+def _stat_or_none(path: str) -> Optional[os.stat_result]:
+    """os.stat(path), 文件不存在时返回 None, 代替 os.path.exists + os.stat 两次调用"""
+    try:
+        return os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def _open_for_read(file_path: str) -> int:
+    """以只读方式打开文件并返回 fd; Linux 下尽量使用 O_NOATIME，避免读取时写回访问时间"""
+    flags = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+    noatime = getattr(os, "O_NOATIME", 0)
+    if noatime:
+        try:
+            return os.open(file_path, flags | noatime)
+        except PermissionError:
+            pass  # 非文件所有者不能使用 O_NOATIME
+    return os.open(file_path, flags)
+
 
 class FileComparer:
     """文件比较类，提供不同比较策略"""
     
     @staticmethod
-    def compare_by_date(file1: str, file2: str, time_factor: int) -> bool:
-        """基于修改日期比较文件"""
-        # micro_error = 0 if time_factor < 1e3 else 1  # 允许微小误差
-        # print(int(time_factor * os.path.getmtime(file1)), int(time_factor * os.path.getmtime(file2)))  ####
-        # return int(time_factor * os.path.getmtime(file1)) - micro_error <= int(time_factor * os.path.getmtime(file2))
-        # return abs(int(time_factor * os.path.getmtime(file1)) - int(time_factor * os.path.getmtime(file2))) <= micro_error
-        micro_error = 2  # 允许误差: micro_error/time_factor (s)
-        #print(time_factor * abs(os.path.getmtime(file1) - os.path.getmtime(file2)))  ####
-        return time_factor * abs(os.path.getmtime(file1) - os.path.getmtime(file2)) <= micro_error
+    def mtime_tolerance_ns(time_factor: int) -> int:
+        """将修改日期的允许误差 (2/time_factor 秒) 换算为整数纳秒, 只需计算一次"""
+        return int(2 * 10**9 // time_factor)
+
+    @staticmethod
+    def compare_stats_by_date(st1: os.stat_result, st2: os.stat_result, tolerance_ns: int) -> bool:
+        """基于已获取的 stat 结果比较修改日期, 用整数纳秒比较, 避免浮点秒的精度损失"""
+        return abs(st1.st_mtime_ns - st2.st_mtime_ns) <= tolerance_ns
     
     @staticmethod
-    def compare_by_hash(file1: str, file2: str, chunk_size: int = 8192) -> bool:
-        """基于文件内容哈希比较文件"""
-        if os.path.getsize(file1) != os.path.getsize(file2):
-            return False  # 文件大小不同，快速返回
+    def compare_by_content(file1: str, file2: str, chunk_size: int = 1 << 20, size: Optional[int] = None) -> bool:
+        """
+        基于文件内容比较文件
+        :param size: 调用方已确认两个文件大小均为 size 时传入, 省去再次 stat
+        """
+        if size is None:
+            size = os.path.getsize(file1)
+            if size != os.path.getsize(file2):
+                return False  # 文件大小不同，快速返回
             
-        hash1 = FileComparer._calculate_hash(file1, chunk_size)
-        hash2 = FileComparer._calculate_hash(file2, chunk_size)
-        return hash1 == hash2
+        # 两个文件都有有效的哈希缓存时直接比较，否则逐块比较内容
+        hash1 = FileComparer._read_cached_hash(file1)
+        hash2 = FileComparer._read_cached_hash(file2) if hash1 else None
+        if hash1 and hash2:
+            return hash1 == hash2
+        return FileComparer._stream_equal(file1, file2, chunk_size)
         
+    XATTR_NAME = "user.sync." + ("blake3" if blake3 is not None else "md5")  # 缓存哈希值的扩展属性
+
     @staticmethod
-    def _calculate_hash(file_path: str, chunk_size: int = 8192) -> str:
-        """计算文件哈希值，使用分块读取提高大文件性能"""
-        hash_md5 = hashlib.md5()
+    def _new_hasher():
+        """优先使用 BLAKE3 (多线程 SIMD), 未安装时回退到 MD5"""
+        if blake3 is not None:
+            return blake3.blake3(max_threads=blake3.blake3.AUTO)
+        return hashlib.md5()
+
+    @staticmethod
+    def _hash_key(st: os.stat_result) -> str:
+        """哈希缓存的校验前缀, mtime 或大小变化即失效"""
+        return f"{st.st_mtime_ns}:{st.st_size}:"
+
+    @staticmethod
+    def _read_cached_hash(file_path: str) -> Optional[str]:
+        """
+        读取扩展属性中缓存的哈希值 (值为 "mtime_ns:size:hash")
+        无缓存、缓存失效或不支持扩展属性 (Windows、FAT 等) 时返回 None
+        """
+        if not hasattr(os, "getxattr"):
+            return None
         try:
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(chunk_size), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
-        except IOError as e:
-            print(f"警告: 计算文件哈希失败 {file_path}: {e}")
-            return ""
+            key = FileComparer._hash_key(os.stat(file_path))
+            value = os.getxattr(file_path, FileComparer.XATTR_NAME).decode()
+        except (OSError, UnicodeDecodeError):
+            return None
+        return value[len(key):] if value.startswith(key) else None
+
+    @staticmethod
+    def _write_cached_hash(fd: int, st: os.stat_result, digest: str):
+        """将哈希值写入扩展属性; 只读文件或不支持扩展属性时忽略, 下次重新比较即可"""
+        if not hasattr(os, "setxattr"):
+            return
+        try:
+            os.setxattr(fd, FileComparer.XATTR_NAME, (FileComparer._hash_key(st) + digest).encode())
+        except OSError:
+            pass
+
+    @staticmethod
+    def _stream_equal(file1: str, file2: str, chunk_size: int = 1 << 20) -> bool:
+        """
+        逐块同步比较两个文件的内容，遇到不同的块立即返回
+        内容完全相同时顺带计算哈希值并缓存到两个文件的扩展属性中, 下次比较无需再读取
+        """
+        try:
+            with os.fdopen(_open_for_read(file1), "rb") as f1, os.fdopen(_open_for_read(file2), "rb") as f2:
+                st1, st2 = os.fstat(f1.fileno()), os.fstat(f2.fileno())
+                if hasattr(os, "posix_fadvise"):
+                    for f in (f1, f2):
+                        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)  # 提示内核加大预读
+                # 复用两块预分配的缓冲区; 整块比较 bytearray 走 memcmp (memoryview 的比较是逐元素的, 反而更慢)
+                buf1, buf2 = bytearray(chunk_size), bytearray(chunk_size)
+                view1 = memoryview(buf1)
+                hasher = FileComparer._new_hasher()
+                while True:
+                    n = f1.readinto(buf1)
+                    if n != f2.readinto(buf2):
+                        return False
+                    if n == chunk_size:
+                        if buf1 != buf2:
+                            return False
+                    elif buf1[:n] != buf2[:n]:
+                        return False
+                    if not n:
+                        break
+                    hasher.update(view1[:n])
+                digest = hasher.hexdigest()
+                FileComparer._write_cached_hash(f1.fileno(), st1, digest)
+                FileComparer._write_cached_hash(f2.fileno(), st2, digest)
+                return True
+        except OSError as e:
+            print(f"警告: 比较文件内容失败 {file1}, {file2}: {e}")
+            return False  # 视为不同, 交给后续复制处理
 
 
 class Logger:
@@ -66,48 +238,50 @@ class Logger:
         log_dir = os.path.dirname(log_file)
         if log_dir and not os.path.exists(log_dir):
             os.makedirs(log_dir)
-            
-        # 设置日志格式
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(message)s'
-        )
+
+        self._timestamp = (0, "")  # (秒级时间戳, 格式化结果), 同一秒内的日志复用格式化结果
+
+    def _now(self) -> str:
+        """返回当前时间的格式化字符串, 每秒只格式化一次"""
+        now = int(time.time())
+        sec, text = self._timestamp
+        if now != sec:
+            text = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+            self._timestamp = (now, text)  # 整体替换, 多线程下也不会读到不一致的两部分
+        return text
         
     def log(self, action: str, path: str):
         """记录并输出一条日志"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        path = path.replace("\\", "/")
+        timestamp = self._now()
+        path = _norm(path)
         log_entry = f"[{timestamp}] {action} {path}"
         self.logs.append(log_entry)
-        logging.info(log_entry)
+        print(log_entry, file=sys.stderr)  # 与原先 logging 的默认输出相同, 写到 stderr
         
     def log_summary(self, summary: str):
         """记录摘要信息"""
         #self.logs.append("\n" + summary)
         self.logs.append(summary)
-        logging.info(summary)
+        print(summary, file=sys.stderr)
         
     def save(self):
-        """保存所有缓存的日志到文件"""
+        """追加所有缓存的日志到文件"""
         try:
-            # 如果日志文件存在，先读取旧内容
-            old_logs = []
-            if os.path.exists(self.log_file):
-                with open(self.log_file, "r", encoding="utf-8") as f:
-                    old_logs = f.readlines()
-                    
-            # 写入新日志
             with open(self.log_file, "a", encoding="utf-8") as f:
-                for log in self.logs:
-                    f.write(f"{log}\n")
-            
-            if self.copy_file is not None:
-                shutil.copy2(self.log_file, self.copy_file)
-                    
+                f.writelines(f"{log}\n" for log in self.logs)
             self.logs = []  # 清空缓存
         except IOError as e:
             print(f"错误: 无法写入日志文件: {e}")
 
+    def flush_mirror(self):
+        """将日志文件复制到镜像位置, 每轮同步结束时调用一次"""
+        if self.copy_file is None:
+            return
+        try:
+            shutil.copy2(self.log_file, self.copy_file)
+        except (IOError, OSError) as e:
+            print(f"错误: 无法复制日志文件: {e}")
+
 
 class NoTracebackError(Exception):
     def __init__(self, message):
@@ -127,13 +301,25 @@ class Source:
         
         self.syncignore_mtime = 0
         self.ignore_rules = []
+        self.ignore_rules_exact = set()  # 与某条规则完全相同的路径
+        self.ignore_pattern = None  # 所有规则合并后的正则表达式, 无规则时为 None
         self.cache_ignore = {}  # key: path, value: True/False
+        self._root_prefixes = {}  # key: 根目录路径, value: 以路径分隔符结尾的前缀
 
     def reset_ignore(self):
-        self.syncignore_mtime = os.path.getmtime(self.syncignore_path) if os.path.exists(self.syncignore_path) else 0
+        self.syncignore_mtime = os.stat(self.syncignore_path).st_mtime if os.path.exists(self.syncignore_path) else 0
         self.ignore_rules = self.get_ignore_rules()
+        self.compile_ignore_rules()
         self.cache_ignore = {}
 
+    def compile_ignore_rules(self):
+        """
+        将所有忽视规则合并编译为一个正则表达式, 每个路径只需匹配一次
+        """
+        rules = [rule.replace("\\", "/") for rule in self.ignore_rules]
+        self.ignore_rules_exact = set(rules)
+        self.ignore_pattern = re.compile("|".join(fnmatch.translate(os.path.normcase(rule)) for rule in rules)) if rules else None
+
     def get_ignore_rules(self) -> List[str]:
         """
         读取 syncignore 文件并返回忽视规则列表
@@ -164,70 +350,61 @@ class Source:
             print(f"警告: 无法读取忽略规则文件: {e}")
             return []
     
-    def is_satisfy_rule(self, path: str, rule: str, root_path: str) -> bool:
+    def is_satisfy_rules(self, path: str, root_path: str, is_dir: Optional[bool] = None) -> bool:
         """
-        检查 path 是否匹配 rule 的表达式
+        检查 path 是否匹配任一忽视规则
         :param path: 文件/文件夹路径
-        :param rule: 一条表达式规则
         :param root_path: source/sync 根目录路径，用于判断一个路径是否是文件夹
+        :param is_dir: 已知 path 是否是文件夹时传入 (如来自 os.scandir), 省去一次 stat
         :return: True - 满足规则, False - 不满足规则
         """
-        if os.path.isdir(os.path.join(root_path, path)):
+        if self.ignore_pattern is None:
+            return False
+
+        if is_dir is None:
+            is_dir = os.path.isdir(os.path.join(root_path, path))
+        if is_dir:
             path = path + "/"
 
-        path = path.replace("\\", "/")  # 兼容Windows路径
-        rule = rule.replace("\\", "/")
-        root_path = root_path.replace("\\", "/")
+        path = _norm(path)  # 兼容Windows路径
 
         # 处理根目录下的文件 (.DS_Store 等)
-        if path == rule:
+        if path in self.ignore_rules_exact:
             return True
         
-        # 处理 ** 通配符 (任意深度目录)
-        # if "**" in rule:
-        #     # 将 ** 转换为正则表达式模式
-        #     regex_pattern = fnmatch.translate(rule)
-        #     regex_pattern = regex_pattern.replace(".*.*", ".*?")  # 处理 ** 转换
-        #     if re.match(regex_pattern, path):
-        #         return True
-        
-        # 检查完整路径匹配
-        if fnmatch.fnmatch(path, rule):
-            return True
-            
-        # 检查文件/目录名匹配
-        # if fnmatch.fnmatch(os.path.basename(path), rule):
-        #     return True
-            
-        # 检查相对路径的每一部分
-        # path_parts = path.split("/")
-        # for i in range(len(path_parts)):
-        #     partial_path = "/".join(path_parts[i:])
-        #     if fnmatch.fnmatch(partial_path, rule):
-        #         return True
-                
-        return False
+        # 检查完整路径匹配 (与 fnmatch.fnmatch 相同, 先 normcase)
+        return self.ignore_pattern.match(os.path.normcase(path)) is not None
 
-    def is_ignore(self, path: str, root_path: str) -> bool:
+    def relative_path(self, path: str, root_path: str) -> str:
+        """
+        计算 path 相对 root_path 的路径
+        遍历得到的路径都以根目录为前缀, 直接切片即可, 避免 os.path.relpath 的开销
+        """
+        prefix = self._root_prefixes.get(root_path)
+        if prefix is None:
+            prefix = self._root_prefixes[root_path] = os.path.join(root_path, "")
+        if path.startswith(prefix):
+            return path[len(prefix):]
+        return os.path.relpath(path, root_path)
+
+    def is_ignore(self, path: str, root_path: str, is_dir: Optional[bool] = None) -> bool:
         """
         检查 path 是否匹配忽视规则
         :param path: 文件/文件夹路径
         :param root_path: source/sync 根目录路径
+        :param is_dir: path 是否是文件夹, None 表示未知
         :return: True - 忽视, False - 不忽视
         """
-        assert os.path.exists(root_path), f"错误: {root_path} 路径不存在"
         assert path.startswith(root_path), f"错误: {root_path} 不是 {path} 的根目录"
 
-        if os.path.samefile(path, root_path) if os.path.exists(path) else False:
+        # 两者都是绝对路径, 直接比较字符串即可判断根目录, 无需 stat
+        relative_path = self.relative_path(path, root_path)
+        if relative_path in (".", ""):
             return False  # 不忽略根目录
-        
-        relative_path = os.path.relpath(path, root_path)
-        #return any(self.is_satisfy_rule(relative_path, rule, root_path) for rule in self.ignore_rules)
-        try:
-            return self.cache_ignore[relative_path]
-        except:
-            self.cache_ignore[relative_path] = any(self.is_satisfy_rule(relative_path, rule, root_path) for rule in self.ignore_rules)
-            return self.cache_ignore[relative_path]
+        result = self.cache_ignore.get(relative_path)
+        if result is None:
+            result = self.cache_ignore[relative_path] = self.is_satisfy_rules(relative_path, root_path, is_dir)
+        return result
 
 
 class Git:
@@ -257,10 +434,12 @@ class Sync(Source):
         self.interval = interval  # int
         self.delete = delete  # True/False
         self.time_factor = time_factor  # int
+        self.mtime_tolerance_ns = FileComparer.mtime_tolerance_ns(time_factor)
         
         self.log_file = os.path.join(self.sync_root_path, "synclog.txt")
         self.logger = Logger(self.log_file, copy_path=self.source_root_path)
         self.file_comparer = FileComparer()
+        self.source_seen = set()  # 本轮同步遍历到的 source 路径, 供删除阶段判断路径是否存在
 
     def confirm_sync(self) -> bool:
         """
@@ -279,25 +458,33 @@ class Sync(Source):
         user_input = input("按回车键继续，输入任意内容退出: ")
         return user_input == ""
 
-    def compare_files(self, src_file: str, dst_file: str) -> bool:
+    def compare_files(self, src_file: str, dst_file: str, src_st: Optional[os.stat_result] = None, dst_st: Optional[os.stat_result] = None) -> bool:
         """
         比较两个文件是否一致（基于模式选择）
         :param src_file: 源文件路径
         :param dst_file: 目标文件路径
+        :param src_st/dst_st: 调用方已有的 stat 结果, 传入后不再重复 stat
         :return: True - 文件相同, False - 文件不同
         """
-        if not os.path.exists(dst_file):
-            return False
+        if dst_st is None:
+            try:
+                # 每个文件只 stat 一次, 之后的比较都复用该结果
+                dst_st = os.stat(dst_file)
+            except FileNotFoundError:
+                return False
 
         try:
+            if src_st is None:
+                src_st = os.stat(src_file)
+            if src_st.st_size != dst_st.st_size:
+                return False  # 大小不同必然是不同文件
             if self.mode == "date":
-                #return self.file_comparer.compare_by_date(src_file, dst_file, time_factor=self.time_factor)
-                is_git_objects_file = (".git/objects/" in src_file.replace("\\", "/")) and (".git/objects/" in dst_file.replace("\\", "/"))
-                is_same_file = self.file_comparer.compare_by_date(src_file, dst_file, time_factor=self.time_factor)
+                is_git_objects_file = _in_git_objects(src_file) and _in_git_objects(dst_file)
+                is_same_file = self.file_comparer.compare_stats_by_date(src_st, dst_st, self.mtime_tolerance_ns)
                 # 若是 .git/objects/ 下的文件, 并且日期判断为不同文件后, 用文件内容进行二次判断 (规避权限问题)
-                return is_same_file if not is_git_objects_file or is_same_file else self.file_comparer.compare_by_hash(src_file, dst_file)
+                return is_same_file if not is_git_objects_file or is_same_file else self.file_comparer.compare_by_content(src_file, dst_file, size=src_st.st_size)
             elif self.mode == "file":
-                return self.file_comparer.compare_by_hash(src_file, dst_file)
+                return self.file_comparer.compare_by_content(src_file, dst_file, size=src_st.st_size)
             return False
         except Exception as e:
             print(f"警告: 比较文件失败 {src_file} 和 {dst_file}: {e}")
@@ -318,7 +505,7 @@ class Sync(Source):
         #    return False
 
         # 2. 校验路径安全性
-        if not ".git/objects/" in file_path.replace("\\", "/"):
+        if not _in_git_objects(file_path):
             self.logger.log("ERROR", f"非法路径: {file_path} 必须位于 .git/objects/ 下")
             return False
 
@@ -344,33 +531,35 @@ class Sync(Source):
             self.logger.log("ERROR", f"删除 {file_path} 失败: {e}")
             return False
 
-    def sync_file(self, src_file: str, dst_file: str) -> Tuple[bool, str]:
+    def sync_file(self, src_file: str, dst_file: str, src_entry: Optional[os.DirEntry] = None) -> Tuple[bool, str]:
         """
         同步单个文件
+        :param src_entry: 源文件的 os.DirEntry, 复用其缓存的 stat 结果
         :return: (是否成功同步, 同步类型 - "added"或"modified"或"unchanged")
         """
         try:
-            if not os.path.exists(dst_file):
+            dst_st = _stat_or_none(dst_file)
+            if dst_st is None:
                 # 确保目标文件所在目录存在
                 dst_dir = os.path.dirname(dst_file)
                 if not os.path.exists(dst_dir):
                     os.makedirs(dst_dir)
                     
-                shutil.copy2(src_file, dst_file)
-                self.logger.log("A", os.path.relpath(dst_file, self.sync_root_path))
+                _copy_file(src_file, dst_file, src_entry.stat() if src_entry else None)
+                self.logger.log("A", self.relative_path(dst_file, self.sync_root_path))
                 return True, "added"
-            elif not self.compare_files(src_file, dst_file):
+            elif not self.compare_files(src_file, dst_file, src_entry.stat() if src_entry else None, dst_st):
                 # 处理 .git/objects 下的文件, 先删除再复制
-                if ".git/objects/" in dst_file.replace("\\", "/"):
+                if _in_git_objects(dst_file):
                     if not self.rm_git_objects_file(dst_file):
                         return False, "error"
 
-                shutil.copy2(src_file, dst_file)
-                self.logger.log("M", os.path.relpath(dst_file, self.sync_root_path))
+                _copy_file(src_file, dst_file, src_entry.stat() if src_entry else None)
+                self.logger.log("M", self.relative_path(dst_file, self.sync_root_path))
                 return True, "modified"
             return True, "unchanged"
         except Exception as e:
-            self.logger.log("ERROR", f"同步文件失败: {os.path.relpath(dst_file, self.sync_root_path)} - {str(e)}")
+            self.logger.log("ERROR", f"同步文件失败: {self.relative_path(dst_file, self.sync_root_path)} - {str(e)}")
             return False, "error"
 
     def sync_directory(self, src_dir: str, dst_dir: str) -> Tuple[int, int, int]:
@@ -387,25 +576,41 @@ class Sync(Source):
             try:
                 os.makedirs(dst_dir)
             except Exception as e:
-                self.logger.log("ERROR", f"无法创建目录: {os.path.relpath(dst_dir, self.sync_root_path)} - {str(e)}")
+                self.logger.log("ERROR", f"无法创建目录: {self.relative_path(dst_dir, self.sync_root_path)} - {str(e)}")
                 return 0, 0, 1
 
-        try:
-            for item in os.listdir(src_dir):
-                src_path = os.path.join(src_dir, item)
-                dst_path = os.path.join(dst_dir, item)
+        # 循环内频繁使用的属性/函数先取为局部变量, 减少解释器查找开销
+        join = os.path.join
+        is_ignore = self.is_ignore
+        sync_file = self.sync_file
+        source_root_path = self.source_root_path
+        source_seen = self.source_seen
 
-                if self.is_ignore(src_path, self.source_root_path):
+        try:
+            # os.scandir 的 DirEntry 自带文件类型, 判断是否为文件夹无需再 stat
+            # 先读完再递归, 避免深层目录同时占用过多目录句柄
+            with os.scandir(src_dir) as entries:
+                entries = list(entries)
+            if os.name == "posix":
+                # 按 inode 顺序处理，读取更接近磁盘上的存放顺序 (POSIX 下 inode 来自 readdir，无需 stat)
+                entries.sort(key=os.DirEntry.inode)
+            for entry in entries:
+                src_path = entry.path
+                dst_path = join(dst_dir, entry.name)
+                is_dir = entry.is_dir()
+
+                if is_ignore(src_path, source_root_path, is_dir):
                     continue
+                source_seen.add(src_path)
 
                 try:
-                    if os.path.isdir(src_path):
+                    if is_dir:
                         a, m, f = self.sync_directory(src_path, dst_path)
                         added += a
                         modified += m
                         failed += f
                     else:
-                        result, action = self.sync_file(src_path, dst_path)
+                        result, action = sync_file(src_path, dst_path, entry)
                         if result:
                             if action == "added":
                                 added += 1
@@ -414,24 +619,27 @@ class Sync(Source):
                         else:
                             failed += 1
                 except Exception as e:
-                    self.logger.log("ERROR", f"同步失败: {os.path.relpath(src_path, self.source_root_path)} - {str(e)}")
+                    self.logger.log("ERROR", f"同步失败: {self.relative_path(src_path, self.source_root_path)} - {str(e)}")
                     failed += 1
                     
             return added, modified, failed
         except Exception as e:
-            self.logger.log("ERROR", f"读取目录失败: {os.path.relpath(src_dir, self.source_root_path)} - {str(e)}")
+            self.logger.log("ERROR", f"读取目录失败: {self.relative_path(src_dir, self.source_root_path)} - {str(e)}")
             return added, modified, failed + 1
 
-    def _is_redundant(self, source_path, sync_path):  # 绝对路径
+    def _is_redundant(self, source_path, sync_path, is_dir=None):  # 绝对路径
         """
         判断 sync_path 是否属于 多余文件/目录
         即: 不在 source 中且不匹配 syncignore 规则，或启用了 delete 并匹配 syncignore 规则
         匹配 syncignore 规则: 判断文件/目录的相对路径
         """ 
-        ignore = self.is_ignore(sync_path, self.sync_root_path)  # bool
-        return (not os.path.exists(source_path) and not ignore) or (self.delete and ignore)
+        ignore = self.is_ignore(sync_path, self.sync_root_path, is_dir)  # bool
+        if ignore:
+            return self.delete
+        # 同步阶段遍历过的路径必然存在, 无需再 stat
+        return source_path not in self.source_seen and not os.path.exists(source_path)
 
-    def is_redundant(self, source_path, sync_path):  # 绝对路径
+    def is_redundant(self, source_path, sync_path, is_dir=None):  # 绝对路径
         """
         判断 sync_path 是否属于 多余文件/目录, 并对匹配忽视规则的文件/目录进行再判断: 
         若上级目录(非根目录)中存在多余目录, 则判定为 多余文件/目录
@@ -440,15 +648,15 @@ class Sync(Source):
         if not os.path.exists(sync_path):
             return False
 
-        ignore = self.is_ignore(sync_path, self.sync_root_path)
-        redundant = self._is_redundant(source_path, sync_path)
+        ignore = self.is_ignore(sync_path, self.sync_root_path, is_dir)
+        redundant = self._is_redundant(source_path, sync_path, is_dir)
         
         while (not self.delete and ignore) and not redundant:
             source_path = os.path.dirname(source_path)
             sync_path = os.path.dirname(sync_path)
             if sync_path == self.sync_root_path:
                 break
-            redundant = self._is_redundant(source_path, sync_path)
+            redundant = self._is_redundant(source_path, sync_path, is_dir=True)  # 上级目录
         
         return redundant
     
@@ -471,7 +679,7 @@ class Sync(Source):
                 #     continue  # 跳过日志文件等
                     
                 sync_path = os.path.join(root, name)
-                relative_path = os.path.relpath(sync_path, self.sync_root_path)
+                relative_path = self.relative_path(sync_path, self.sync_root_path)
                 source_path = os.path.join(self.source_root_path, relative_path)
                 
                 if relative_path in special_files:
@@ -479,8 +687,8 @@ class Sync(Source):
                     
                 try:
                     #if not os.path.exists(source_path) or self.is_ignore(source_path):
-                    if self.is_redundant(source_path, sync_path):
-                        if ".git/objects/" in sync_path.replace("\\", "/"):
+                    if self.is_redundant(source_path, sync_path, is_dir=False):
+                        if _in_git_objects(sync_path):
                             if not self.rm_git_objects_file(sync_path):
                                 raise NoTracebackError(f"Remove {sync_path} failed")
                         else: 
@@ -493,12 +701,12 @@ class Sync(Source):
 
             for name in dirs:
                 sync_path = os.path.join(root, name)
-                relative_path = os.path.relpath(sync_path, self.sync_root_path)
+                relative_path = self.relative_path(sync_path, self.sync_root_path)
                 source_path = os.path.join(self.source_root_path, relative_path)
 
                 try:
                     #if not os.path.exists(source_path) or self.is_ignore(source_path):
-                    if self.is_redundant(source_path, sync_path):
+                    if self.is_redundant(source_path, sync_path, is_dir=True):
                         # 确保目录为空
                         if not os.listdir(sync_path):
                             os.rmdir(sync_path)
@@ -538,7 +746,8 @@ class Sync(Source):
             def ignore_func(src, names):
                 return [name for name in names if self.is_ignore(os.path.join(src, name), self.source_root_path)]
                 
-            shutil.copytree(self.source_root_path, self.sync_root_path, ignore=ignore_func)
+            # 逐个文件用 _copy_file 复制，在写时复制文件系统上直接 reflink
+            shutil.copytree(self.source_root_path, self.sync_root_path, ignore=ignore_func, copy_function=_copy_file)
             
             # 恢复旧日志
             if old_logs:
@@ -576,7 +785,7 @@ class Sync(Source):
             source_sync_message = f"源目录 -> 目标目录: {self.source_root_path} -> {self.sync_root_path}\n"
             self.logger.log_summary(source_sync_message)
 
-            if not os.path.exists(self.syncignore_path) or os.path.getmtime(self.syncignore_path) > self.syncignore_mtime:
+            if not os.path.exists(self.syncignore_path) or os.stat(self.syncignore_path).st_mtime > self.syncignore_mtime:
                 # 如果上次和这次都不存在 syncignore 文件, 跳过载入忽略规则
                 if not os.path.exists(self.syncignore_path) and self.syncignore_mtime == 0:
                     pass
@@ -595,6 +804,7 @@ class Sync(Source):
                 else:
                     # 普通增量同步
                     print("执行增量同步...")
+                    self.source_seen.clear()
                     added, modified, sync_failed = self.sync_directory(self.source_root_path, self.sync_root_path)
                     deleted_files, deleted_dirs, del_failed = self.remove_extra_files()
                     failed = sync_failed + del_failed
@@ -617,6 +827,7 @@ class Sync(Source):
                     end_message = "已完成单次同步，程序退出"
                     self.logger.log_summary(end_message)
                     self.logger.save()
+                    self.logger.flush_mirror()
                     break
                     
                 # 显示等待信息
@@ -625,18 +836,21 @@ class Sync(Source):
                 #print(wait_message)
                 self.logger.log_summary(wait_message)
                 self.logger.save()
+                self.logger.flush_mirror()
                 time.sleep(self.interval)
                 
             except KeyboardInterrupt:
                 interrupt_message = "\n同步被用户中断。"
                 self.logger.log_summary(interrupt_message)
                 self.logger.save()
+                self.logger.flush_mirror()
                 break
             except Exception as e:
                 error_message = f"同步过程中发生错误: {e}"
                 self.logger.log_summary(error_message)
                 # 错误后也保存日志
                 self.logger.save()
+                self.logger.flush_mirror()
                 if self.interval <= 0:
                     break
                 time.sleep(self.interval)
@@ -1,5 +1,5 @@
 """
-python tasker.py <tasker_id> <mode>
+python tasker.py <tasker_id> <mode> [-j K]
 
 You should NOT manually change the files under ~/my/.tasker/ directory:
 * Do NOT manually MODIFY the tasker file 'tasker.<id>.json'
@@ -9,12 +9,30 @@ You should NOT manually change the files under ~/my/.tasker/ directory:
 import argparse
 import functools
 import json
-import shutil
+import os
+import queue
+import select
+import shlex
 import subprocess
+import sys
 import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 from typing import List
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+try:
+    import orjson  # Optional: `pip install orjson`, faster load/save of the tasker file
+except ImportError:
+    orjson = None
+try:
+    from inotify_simple import INotify, flags as inotify_flags  # Optional: `pip install inotify_simple`
+except ImportError:
+    INotify = None
 try:
     from logger import Logger
 except ImportError:
@@ -31,20 +49,43 @@ if SEND_EMAIL:  # Require: `pip install python-dotenv`
     except ImportError:
         from .auto_email import send_email
 
-def lock() -> bool:
-    if lock_file.exists():
-        logger.logger.debug("Lock file already exists. Another instance may be running.")
-        return False
-    lock_file.touch(exist_ok=False)
-    return True
+# An OS lock on the lock file is held by open file, not by thread; threads of this process take this one first
+_thread_lock = threading.Lock()
 
-def check_lock() -> bool:
-    return lock_file.exists()
+def lock(shared=False):
+    """
+    Block until the lock is held. Released by the OS if the process dies.
+    A shared lock only waits for exclusive holders in other processes (exclusive on Windows).
+    """
+    _thread_lock.acquire()
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            os.lseek(lock_fd, 0, os.SEEK_SET)
+            # LK_LOCK retries only once a second; most critical sections take milliseconds,
+            # so poll without blocking and back off from 1 ms up to that second
+            delay = 0.001
+            while True:
+                try:
+                    msvcrt.locking(lock_fd, msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(delay)
+                    delay = min(delay * 2, 1.0)
+    except BaseException:
+        _thread_lock.release()
+        raise
 
 def unlock():
-    if not lock_file.exists():
-        logger.logger.warning("Failed to unlock - lock file not exists.")
-    else: lock_file.unlink()
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(lock_fd, 0, os.SEEK_SET)
+            msvcrt.locking(lock_fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        _thread_lock.release()
 
 def synchronized(level="positive"):
     """
@@ -56,25 +97,127 @@ def synchronized(level="positive"):
     def decorator(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            while not lock() if level == "positive" else check_lock():
-                time.sleep(1)  # Wait for the lock to be released
-            result = func(*args, **kwargs)
-            if level == "positive": unlock()
-            return result
+            if level == "negative":
+                lock(shared=True)
+                unlock()  # Only wait for the lock to be released
+                return func(*args, **kwargs)
+            lock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                unlock()
         return wrapper
     return decorator
 
+# (stat, tasks): the tasks last loaded from or saved to the tasker file, while it is still at `stat`
+_loaded_tasks = (None, None)
+
+def forget_loaded_tasks():
+    """ Drop the cached tasks, e.g. when they were changed but could not be saved. """
+    global _loaded_tasks
+    _loaded_tasks = (None, None)
+
+def save_tasks(tasks: dict):
+    """ **Should be wrapped with lock**. Write all tasks to the tasker file; raise on error. """
+    global _loaded_tasks
+    try:
+        # Write a temporary file and rename it over the old one: the tasker file is never half-written
+        with open(tasker_tmp_path, 'wb') as f:
+            # Compact, without indentation: the file is only read by the tasker, see `la` for a readable view
+            if orjson is not None:
+                f.write(orjson.dumps(tasks))
+            else:
+                f.write(json.dumps(tasks, separators=(",", ":")).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tasker_tmp_path, tasker_path)
+    except BaseException:
+        forget_loaded_tasks()
+        raise
+    _loaded_tasks = (tasker_file_stat(), tasks)  # The next load needs no parsing if nobody else writes
+
+def tasker_file_stat() -> tuple:
+    """ (mtime, size, inode) of the tasker file, or None if missing; changes whenever it is rewritten """
+    try:
+        st = os.stat(tasker_path)
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    except OSError:
+        return None
+
+# (stat, i): in the tasker file at `stat`, no task before the i-th one is pending
+_pending_hint = (None, 0)
+
+# Task status changes waiting to be written: (work_dir, command, require, status)
+_pending_saves = queue.SimpleQueue()
+
+@synchronized()
+def flush_task_saves():
+    """ Apply all queued Task.save() changes with a single load and save of the tasker file. """
+    global _pending_hint
+    updates = []
+    while True:
+        try:
+            updates.append(_pending_saves.get_nowait())
+        except queue.Empty:
+            break
+    if not updates:
+        return  # Already written by another thread
+    commands = ", ".join(f"`{u[1]}`" for u in updates)
+    try:
+        tasks = load_tasks()  # Usually what this process saved last, so not parsed again
+        if not isinstance(tasks, dict): 
+            raise ValueError("")
+        loaded_stat = _loaded_tasks[0]
+        for work_dir, command, require, status in updates:
+            found = False
+            for k, v in tasks.items():  # First task whose content is same with the current task
+                if v["cmd"] == command and v["wd"] == work_dir and v["status"] == require:
+                    tasks[k]["status"], found = status, True
+                    break
+            if not found:  # If not found, add a new task
+                task_id: int = len(tasks) + 1
+                while str(task_id) in tasks:  # Find a new task ID
+                    task_id += 1
+                tasks[str(task_id)] = {
+                    "wd": work_dir,
+                    "cmd": command,
+                    "status": status
+                }
+        save_tasks(tasks)
+        if loaded_stat is not None and loaded_stat == _pending_hint[0] and \
+                all(u[3] != "pending" for u in updates):
+            _pending_hint = (_loaded_tasks[0], _pending_hint[1])  # No task became pending: hint still holds
+    
+    except Exception as e:
+        forget_loaded_tasks()  # Tasks may be changed in memory but not saved
+        logger.logger.error(f"Error saving task {commands}: {e}. "
+                            "This may cause fatal error. Please check.")
+    except KeyboardInterrupt:
+        forget_loaded_tasks()
+        logger.logger.error(f"Keyboard interrupt received while saving task {commands}. "
+                            "This may cause fatal error. Please check.")
+    finally: pass
+
 def load_tasks() -> dict:
-    """ **Should be wrapped with lock**. Return 'failure' on error. """
+    """
+    **Should be wrapped with lock**. Return 'failure' on error.
+    Skip parsing while the tasker file is unchanged since it was last loaded or saved.
+    """
+    global _loaded_tasks
     try:
-        with open(tasker_file, 'r') as f:
-            tasks = json.load(f)
+        stat = tasker_file_stat()
+        if stat is not None and stat == _loaded_tasks[0]:
+            return _loaded_tasks[1]
+        with open(tasker_path, 'rb') as f:
+            data = f.read()
+        tasks = orjson.loads(data) if orjson is not None else json.loads(data)
+        _loaded_tasks = (stat, tasks)
         return tasks
     except FileNotFoundError:
         logger.logger.warning(f"Tasks file not found. Creating a new one.")
-        with open(tasker_file, 'w') as f:
-            json.dump({}, f)
-        return {}
+        tasks = {}
+        save_tasks(tasks)
+        return tasks
     
     except Exception as e:
         logger.logger.error(f"Error loading tasks: {e}")
@@ -84,72 +227,60 @@ def load_tasks() -> dict:
         return "failure"
     finally: pass
 
+TASK_STATUSES = frozenset({"pending", "running", "completed", "failed"})
+ACTIVE_STATUSES = frozenset({"pending", "running"})  # Tasks not finished yet, listed by `ls`
+
+@functools.lru_cache(maxsize=128)
+def split_command(command: str) -> tuple:
+    """ Arguments of COMMAND with quoted ones kept together; a command run again is not tokenized again. """
+    return tuple(shlex.split(command))
+
 class Task:
     def __init__(self, task_id: int, work_dir: str, command: str, status: str):
         self.task_id: int = task_id
         self.work_dir: str = work_dir
         self.command: str = command
         self.status: str = status
-        assert self.status in ["pending", "running", "completed", "failed"], "Invalid status"
+        assert self.status in TASK_STATUSES, "Invalid status"
     
-    @synchronized()
     def save(self, require: str):
-        try:
-            tasks = load_tasks()
-            if not isinstance(tasks, dict) or not require in ["pending", "running"]: 
-                raise ValueError("")
-            found = False
-            for k, v in tasks.items():  # First task whose content is same with the current task
-                if v["cmd"] == self.command and v["wd"] == self.work_dir and v["status"] == require:
-                    tasks[k]["status"], found = self.status, True
-                    break
-            if not found:  # If not found, add a new task
-                task_id: int = len(tasks) + 1
-                while str(task_id) in tasks:  # Find a new task ID
-                    task_id += 1
-                tasks[str(task_id)] = {
-                    "wd": self.work_dir,
-                    "cmd": self.command,
-                    "status": self.status
-                }
-            shutil.copy(str(tasker_file), str(tasker_file) + ".copy")
-            with open(tasker_file, 'w') as f:
-                json.dump(tasks, f, indent=4)
-        
-        except Exception as e:
-            logger.logger.error(f"Error saving task `{self.command}`: {e}. "
-                                "This may cause fatal error. Please check.")
-        except KeyboardInterrupt:
-            logger.logger.error(f"Keyboard interrupt received while saving task `{self.command}`. "
-                                "This may cause fatal error. Please check.")
-        finally: pass
+        """
+        Set the status of the first task with the same content and status `require`,
+        or add the task if none. Changes queued by other threads meanwhile are written together.
+        """
+        if not require in ACTIVE_STATUSES:
+            logger.logger.error(f"Error saving task `{self.command}`: invalid require status '{require}'.")
+            return
+        _pending_saves.put((self.work_dir, self.command, require, self.status))
+        flush_task_saves()
 
     def run(self):
         """
         Run the task command in its work directory.
+        A task claimed by Tasker.load_1st_pending_task() is already saved as running.
         """
-        if not self.status == "pending":
-            logger.logger.warning(f"Task {self.task_id} is not pending: {self.status}")
-            return
-        
-        if not Path(self.work_dir).exists():  # Ensure the work directory exists
-            self.status = "failed"
-            logger.logger.error(f"Task {self.task_id} failed - work directory '{self.work_dir}' does not exist.")
+        if self.status == "pending":
+            self.status = "running"
             self.save(require="pending")
+        elif not self.status == "running":
+            logger.logger.warning(f"Task {self.task_id} is not pending: {self.status}")
             return
         
         # Run the command
-        self.status = "running"
         logger.logger.info(f"Running task {self.task_id}: `{self.command}` in '{self.work_dir}'")
-        self.save(require="pending")
         try:
+            args = split_command(self.command)
             if LOG_LEVEL == "DEBUG":
-                result = subprocess.run(self.command.split(), cwd=self.work_dir, capture_output=True, text=True)
+                # Log the output line by line as it comes instead of holding all of it in memory;
+                # stderr goes into the same pipe, so it is read here without helper threads
+                with subprocess.Popen(args, cwd=self.work_dir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                      text=True, errors="replace", bufsize=1) as proc:
+                    for line in proc.stdout:
+                        logger.logger.debug(f"Task `{self.command}` output: {line.rstrip()}")
+                    returncode = proc.wait()
             else:
-                result = subprocess.run(self.command.split(), cwd=self.work_dir)
-            if result.stdout: logger.logger.debug(f"Task `{self.command}` stdout: {result.stdout}")
-            if result.stderr: logger.logger.debug(f"Task `{self.command}` stderr: {result.stderr}")
-            if result.returncode == 0:
+                returncode = subprocess.run(args, cwd=self.work_dir).returncode
+            if returncode == 0:
                 self.status = "completed"
             else:
                 self.status, error = "failed", "Non-zero exit code"
@@ -170,24 +301,49 @@ class Task:
                         <strong>Work Directory:</strong> {self.work_dir}</p>
                         <p>Task end with status <span class="error">failed</span>:</p>
                         <div class="note">{error}</div>
-                    """, config_env=EMAIL_CONFIG, content_type="html")
+                    """, config_env=EMAIL_CONFIG, content_type="html", blocking=True)
                     logger.logger.info(f"Sent email notification for failed task.")
                 except Exception as e:
                     logger.logger.error(f"Failed to send email notification for failed task: {e}")
 
 class Tasker:
-    def __init__(self):
+    def __init__(self, jobs: int = 1):
         self.task: Task = None
+        self.jobs: int = jobs  # Max number of tasks running at once
+        # (tasks, ids): task ids of the loaded tasks dict in order; status saves keep the same dict and ids
+        self._task_ids: tuple = (None, None)
     
     @synchronized()
-    def load_1st_pending_task(self) -> bool:
-        """ Return 'failure' on error. """
+    def load_1st_pending_task(self, busy_dirs=()) -> bool:
+        """
+        Claim the first pending task by saving it as running, skipping tasks whose work directory is in `busy_dirs`.
+        Return 'failure' on error.
+        """
+        global _pending_hint
         tasks = load_tasks()
         if not isinstance(tasks, dict): return "failure"
         
         try:
-            for task_id in sorted(tasks.keys(), key=int):
+            cached_tasks, task_ids = self._task_ids
+            if tasks is not cached_tasks or len(task_ids) != len(tasks):  # Reloaded, or a task was added
+                task_ids = list(tasks.keys())
+                if not all(k == str(i) for i, k in enumerate(task_ids, 1)):
+                    task_ids.sort(key=int)
+                self._task_ids = (tasks, task_ids)
+            # Tasks before the hint were checked in this same version of the file
+            stat = _loaded_tasks[0]
+            start = _pending_hint[1] if stat is not None and stat == _pending_hint[0] else 0
+            skipped = None  # First pending task left for later: the hint must not pass it
+            for i in range(start, len(task_ids)):
+                task_id = task_ids[i]
                 if tasks[task_id]["status"] == "pending":
+                    if tasks[task_id]["wd"] in busy_dirs:
+                        if skipped is None: skipped = i
+                        continue
+                    # Claimed under the same lock it was found in: no other worker can take it
+                    tasks[task_id]["status"] = "running"
+                    save_tasks(tasks)
+                    _pending_hint = (_loaded_tasks[0], i + 1 if skipped is None else skipped)
                     self.task = Task(
                         task_id=int(task_id),
                         work_dir=tasks[task_id]["wd"],
@@ -195,6 +351,7 @@ class Tasker:
                         status=tasks[task_id]["status"]
                     )
                     return True
+            _pending_hint = (stat, len(task_ids) if skipped is None else skipped)
             return False  # No pending tasks found
         
         except Exception as e:
@@ -207,9 +364,11 @@ class Tasker:
     
     def run(self) -> int:
         """
-        Run all pending tasks, and return the count of tasks run. 
+        Run all pending tasks, up to `jobs` at a time, and return the count of tasks run. 
         Return 'failure' on error.
         """
+        if self.jobs > 1:
+            return self._run_parallel()
         count = 0
         while True:
             if pause_file.exists():
@@ -226,8 +385,53 @@ class Tasker:
                 count += 1
                 self.task.run()
         return count
+    
+    def _run_parallel(self) -> int:
+        """
+        Same as run(), but keep up to `jobs` tasks running in a thread pool.
+        Tasks in the same work directory still run one at a time, in queue order.
+        """
+        count, failure = 0, False
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            running = {}  # Future: work directory of its task
+            while True:
+                while len(running) < self.jobs and not failure and not pause_file.exists():
+                    status = self.load_1st_pending_task(busy_dirs=set(running.values()))
+                    if status == "failure" or status is None:  # Error occurred
+                        failure = True
+                    elif not status:  # No more pending tasks
+                        break
+                    else:
+                        count += 1
+                        running[pool.submit(self.task.run)] = self.task.work_dir
+                if not running:
+                    break
+                try:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done: del running[future]
+                except KeyboardInterrupt:  # Also sent to the running commands, which then fail
+                    logger.logger.info("Keyboard interrupt received while running tasks.")
+        return "failure" if failure else count
+
+@functools.lru_cache(maxsize=128)
+def resolve_work_dir(work_dir: str) -> str:
+    """ Absolute path of WORK_DIR; an absolute path without '..' is only normalized, with no filesystem access. """
+    if os.path.isabs(work_dir) and ".." not in work_dir.split(os.sep):
+        return os.path.normpath(work_dir)
+    return str(Path(work_dir).resolve())
 
 def timed_input(prompt: str, timeout: float) -> str:
+    if fcntl is not None:  # POSIX: wait on stdin with select, no helper thread
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        ready, _, _ = select.select([sys.stdin], [], [], timeout)
+        if not ready:
+            raise TimeoutError
+        line = sys.stdin.readline()
+        if not line:
+            raise EOFError
+        return line.rstrip("\n")
+
     result = {"value": None}
 
     def _worker():
@@ -246,26 +450,31 @@ def confirm_input(prompt: str) -> str:
     except TimeoutError:
         print()
         return "n"
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, EOFError):
         print()
         return "n"
 
 class Operator:
-    def __init__(self, _tasker_id: str):
+    def __init__(self, _tasker_id: str, jobs: int = 1):
         files_dir = Path.home() / "my" / ".tasker"
         files_dir.mkdir(parents=True, exist_ok=True)
 
-        global tasker_id, logger, tasker_file, lock_file, run_file, pause_file
+        global tasker_id, logger, tasker_file, tasker_path, tasker_tmp_path, lock_file, lock_fd, run_file, pause_file
         tasker_id = _tasker_id
         logger = Logger(name=str(files_dir / f"tasker_{tasker_id}"), 
                         level=LOG_LEVEL, width=80, start_from=9)
         tasker_file = files_dir / f"tasker.{tasker_id}.json"
+        tasker_path = str(tasker_file)  # Converted once for the file operations on every load and save
+        tasker_tmp_path = tasker_path + ".tmp"
         lock_file = files_dir / f".tasker.{tasker_id}.lock"
+        lock_fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o644)  # Kept open, see lock()
         run_file = files_dir / f".tasker.{tasker_id}.run"
         pause_file = files_dir / f".tasker.{tasker_id}.pause"
 
-        self.tasker = Tasker()
-        self.tasks: dict = None
+        self.tasker = Tasker(jobs)
+        self._watch = None  # INotify on the tasker directory while running
+        self.tasks: List[dict] = None  # Task at position i is self.tasks[i-1]
+        self.task_keys: List[str] = None  # Keys as found in the tasker file, see check_valid_tasks
         self.n_tasks: int = None
         
     def run(self):
@@ -275,11 +484,19 @@ class Operator:
             return
         try:
             run_file.touch(exist_ok=False)  # Create a run file to indicate running state
+            if INotify is not None:
+                try:
+                    self._watch = INotify()
+                    self._watch.add_watch(str(tasker_file.parent), inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO
+                                          | inotify_flags.CREATE | inotify_flags.DELETE)
+                except OSError as e:
+                    self._watch = None
+                    logger.logger.warning(f"Failed to watch the tasker directory, polling instead: {e}")
             
             flag, start_wait, max_wait = False, None, 3 * (24*(60*60))
+            last_beat = time.time()
+            poll = 0.5  # Polling interval without inotify: short right after the last task, backing off to 10 seconds
             while True:
-                run_file.touch(exist_ok=True)  # Make sure the run file exists
-                
                 n_runs = self.tasker.run()
                 try:
                     if n_runs == "failure":
@@ -303,10 +520,21 @@ class Operator:
                                 logger.logger.info("No tasks run for a long time, exiting.")
                                 break
                             else:
-                                run_file.touch(exist_ok=True)  # Make sure the run file exists
-                                time.sleep(10)  # Wait before checking again
+                                if time.time() - last_beat >= 60:  # Heartbeat: refresh the run file once a minute
+                                    try:
+                                        os.utime(run_file, None)
+                                    except FileNotFoundError:
+                                        logger.logger.warning("Run file not found while running. Creating it again.")
+                                        run_file.touch(exist_ok=True)
+                                    last_beat = time.time()
+                                # inotify wakes the wait on changes, so it only has to end for the next heartbeat
+                                if self._watch is None:
+                                    self.wait_for_change(poll)
+                                    poll = min(poll * 1.5, 10)
+                                else:
+                                    self.wait_for_change(60 - (time.time() - last_beat))
                     else:
-                        flag = False  # Reset flag if tasks were run
+                        flag, poll = False, 0.5  # Reset flag and polling interval if tasks were run
                 
                 except KeyboardInterrupt:
                     logger.logger.info("Keyboard interrupt received. Exiting.")
@@ -315,9 +543,27 @@ class Operator:
                     logger.logger.error(f"Unexpected error when running: {e}")
                     break
         finally:
+            if self._watch is not None:
+                self._watch.close()
+                self._watch = None
             if run_file.exists(): run_file.unlink()  # Remove run file when done
             else: logger.logger.warning("Run file not found after the run done.")
     
+    def wait_for_change(self, timeout: float):
+        """ Sleep up to `timeout` seconds; with inotify, wake as soon as the tasker or pause file changes. """
+        if self._watch is None:
+            time.sleep(timeout)
+            return
+        names = {tasker_file.name, pause_file.name}
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return
+            # Other files in the directory (logs, other taskers) also raise events
+            if any(event.name in names for event in self._watch.read(timeout=int(remaining * 1000) + 1)):
+                return
+
     @synchronized()
     def auto_lsall_email(self) -> bool:
         try:
@@ -325,7 +571,7 @@ class Operator:
                 send_email("All tasks done", f"""
                     Tasker {tasker_id} has completed all tasks.
                     {get_table_content(self.tasks)}
-                """, config_env=EMAIL_CONFIG, content_type="html")
+                """, config_env=EMAIL_CONFIG, content_type="html", blocking=True)
                 return True
             else: 
                 logger.logger.error("Failed to load tasks. Please check the tasker file.")
@@ -336,9 +582,13 @@ class Operator:
 
     def _load_tasks(self) -> bool:
         """ **Should be wrapped with lock** """
-        self.tasks = load_tasks()
-        if not isinstance(self.tasks, dict): 
+        tasks = load_tasks()
+        if not isinstance(tasks, dict): 
             return False
+        # Keep tasks as a list so inserting/removing does not re-key the rest;
+        # keys "1".."N" are only rebuilt when saving
+        self.task_keys = list(tasks.keys())
+        self.tasks = list(tasks.values())
         self.n_tasks = len(self.tasks)
         return True
     
@@ -351,7 +601,7 @@ class Operator:
             if not pause_file.exists():
                 pause_file.touch(exist_ok=False)
                 if self._load_tasks():
-                    for task_id, task_info in self.tasks.items():
+                    for task_id, task_info in enumerate(self.tasks, 1):
                         pause_task = None
                         if task_info['status'] == 'running':
                             pause_task = [task_id, task_info['cmd']]
@@ -380,12 +630,11 @@ class Operator:
     
     def check_valid_tasks(self) -> bool:
         """ Check if all task keys are ordered. Run after loading tasks. """
-        if self.tasks is None:
+        if self.task_keys is None:
             return False
-        # Convert string keys to integers for comparison
+        # Compare as integers; stop at the first key out of order
         try:
-            int_keys = [int(k) for k in self.tasks.keys()]
-            return int_keys == list(range(1, len(self.tasks) + 1))
+            return all(int(k) == i for i, k in enumerate(self.task_keys, 1))
         except ValueError:
             return False
     
@@ -403,15 +652,16 @@ class Operator:
                     logger.logger.error(f"Task keys are not ordered. Please run `tasker.py {tasker_id} fix` to fix it.")
                     
                 elif self.n_tasks == 0 or ( only_pending and 
-                        sum(1 for task in self.tasks.values() if task['status'] in ['pending', 'running']) == 0 ):
+                        not any(task['status'] in ACTIVE_STATUSES for task in self.tasks) ):
                     logger.divider.write("No tasks in the queue.")
                 else:
-                    for task_id, task_info in self.tasks.items():
-                        if only_pending and task_info['status'] not in ['pending', 'running']:
-                            continue
-                        logger.divider._write(f"{task_id:>5} | ---[ {task_info['status']} ]---\n"
-                                              f"      | {task_info['cmd']}\n"
-                                              f"      | {task_info['wd']}\n")
+                    # One write for the whole listing instead of one per task
+                    logger.divider._write("".join(
+                        f"{task_id:>5} | ---[ {task_info['status']} ]---\n"
+                        f"      | {task_info['cmd']}\n"
+                        f"      | {task_info['wd']}\n"
+                        for task_id, task_info in enumerate(self.tasks, 1)
+                        if not only_pending or task_info['status'] in ACTIVE_STATUSES))
             else: logger.logger.error("Failed to load tasks. Please check the tasker file.")
         except Exception as e:
             logger.logger.error(f"Unexpected error when listing tasks: {e}")
@@ -421,9 +671,7 @@ class Operator:
     def save(self) -> bool:
         """ **Should be wrapped with lock** """
         try:
-            shutil.copy(str(tasker_file), str(tasker_file) + ".copy")
-            with open(tasker_file, 'w') as f:
-                json.dump(self.tasks, f, indent=4)
+            save_tasks({str(i): task for i, task in enumerate(self.tasks, 1)})
             return True
         except Exception as e:
             logger.logger.error(f"Error saving tasks: {e}")
@@ -467,9 +715,7 @@ class Operator:
             return False
         
         try:
-            for i in reversed(range(pos+1, self.n_tasks+1 + 1)):
-                self.tasks[str(i)] = self.tasks[str(i - 1)]
-            self.tasks[str(pos)] = task_info
+            self.tasks.insert(pos - 1, task_info)
             self.n_tasks += 1
             return True
         except Exception as e:
@@ -486,11 +732,8 @@ class Operator:
             return False
         
         try:
-            removed_task = self.tasks.pop(str(pos))
+            removed_task = self.tasks.pop(pos - 1)
             self.n_tasks -= 1
-            # Shift tasks down
-            for i in range(pos, self.n_tasks + 1):
-                self.tasks[str(i)] = self.tasks.pop(str(i + 1))
             return removed_task
         except Exception as e:
             return False
@@ -501,8 +744,10 @@ class Operator:
         logger.logger.info(f"[USER OPERATION] Appended task")
         logger.divider.word_line("append")
         try:
-            work_dir = str(Path(work_dir).resolve())
-            if self._load_tasks():
+            work_dir = resolve_work_dir(str(work_dir))
+            if not os.path.isdir(work_dir):  # Checked once here instead of when the task runs
+                logger.logger.error(f"Work directory '{work_dir}' does not exist.")
+            elif self._load_tasks():
                 if not self.check_valid_tasks():
                     logger.logger.error(f"Task keys are not ordered. Please run `tasker.py {tasker_id} fix` to fix it.")
 
@@ -529,8 +774,10 @@ class Operator:
         logger.logger.info(f"[USER OPERATION] Insert task at position {pos}")
         logger.divider.word_line("insert")
         try:
-            work_dir = str(Path(work_dir).resolve())
-            if self._load_tasks():
+            work_dir = resolve_work_dir(str(work_dir))
+            if not os.path.isdir(work_dir):  # Checked once here instead of when the task runs
+                logger.logger.error(f"Work directory '{work_dir}' does not exist.")
+            elif self._load_tasks():
                 if pos == -1: pos = self.n_tasks
                 if not self.check_valid_tasks():
                     logger.logger.error(f"Task keys are not ordered. Please run `tasker.py {tasker_id} fix` to fix it.")
@@ -564,8 +811,8 @@ class Operator:
                     logger.logger.error(f"Task keys are not ordered. Please run `tasker.py {tasker_id} fix` to fix it.")
                 
                 elif not self.check_position(pos, self.n_tasks): pass  # Invalid position
-                elif not run_file.exists() or self.tasks[str(pos)]['status'] != "running":
-                    confirm = confirm_input(f"Task status at position {pos} is {self.tasks[str(pos)]['status']}. \n"
+                elif not run_file.exists() or self.tasks[pos - 1]['status'] != "running":
+                    confirm = confirm_input(f"Task status at position {pos} is {self.tasks[pos - 1]['status']}. \n"
                                             "Are you sure you want to remove it? (y/n): ").strip().lower()
                     if confirm == 'y':
                         removed_task = self.remove_task(pos)
@@ -601,15 +848,15 @@ class Operator:
                 
                 elif pos == target_pos:
                     logger.logger.info(f"Task already at position {pos}.")
-                elif not self.check_position(pos, self.n_tasks): pass  # Invalid position
-                elif self.insert_task(target_pos + 1 if pos < target_pos else target_pos, self.tasks[str(pos)]) and (
-                        self.remove_task(pos if pos < target_pos else pos + 1) ):
+                elif not self.check_position(pos, self.n_tasks) or not self.check_position(target_pos, self.n_tasks):
+                    pass  # Invalid position
+                else:
+                    self.tasks.insert(target_pos - 1, self.tasks.pop(pos - 1))  # One shift of the tasks in between
                     if self.save():
                         logger.divider._write(f"Moved task from position {pos} to {target_pos}:\n"
-                                              f"    Command: {self.tasks[str(target_pos)]['cmd']}\n"
-                                              f"    Work Directory: {self.tasks[str(target_pos)]['wd']}\n")
+                                              f"    Command: {self.tasks[target_pos - 1]['cmd']}\n"
+                                              f"    Work Directory: {self.tasks[target_pos - 1]['wd']}\n")
                     else: logger.logger.error("Error saving tasks after moving.")
-                else: logger.logger.error("Error moving task. Exiting.")
             else: logger.logger.error("Failed to load tasks. Please check the tasker file.")
         except Exception as e:
             logger.logger.error(f"Unexpected error when moving task: {e}")
@@ -628,11 +875,11 @@ class Operator:
                     logger.logger.error(f"Task keys are not ordered. Please run `tasker.py {tasker_id} fix` to fix it.")
 
                 elif self.check_position(pos, self.n_tasks): 
-                    self.tasks[str(pos)]["status"] = "pending"
+                    self.tasks[pos - 1]["status"] = "pending"
                     if self.save():
                         logger.divider._write(f"Rerun task at position {pos}:\n"
-                                              f"    Command: {self.tasks[str(pos)]['cmd']}\n"
-                                              f"    Work Directory: {self.tasks[str(pos)]['wd']}\n")
+                                              f"    Command: {self.tasks[pos - 1]['cmd']}\n"
+                                              f"    Work Directory: {self.tasks[pos - 1]['wd']}\n")
                     else: logger.logger.error("Error saving tasks after rerun.")
                 # else: logger.logger.error(f"Invalid position {pos} for rerun.")
             else: logger.logger.error("Failed to load tasks. Please check the tasker file.")
@@ -655,11 +902,11 @@ class Operator:
                 elif pos1 == pos2 or not self.check_position(pos1, self.n_tasks) or not self.check_position(pos2, self.n_tasks):
                     logger.logger.error(f"Invalid position {pos1} and {pos2} for swap.")
                 else:
-                    self.tasks[str(pos1)], self.tasks[str(pos2)] = self.tasks[str(pos2)], self.tasks[str(pos1)]
+                    self.tasks[pos1 - 1], self.tasks[pos2 - 1] = self.tasks[pos2 - 1], self.tasks[pos1 - 1]
                     if self.save():
                         logger.divider._write(f"Swapped tasks at positions {pos1} and {pos2}, now:\n"
-                                              f"{pos1:>5}: {self.tasks[str(pos1)]['cmd']}\n"
-                                              f"{pos2:>5}: {self.tasks[str(pos2)]['cmd']}\n")
+                                              f"{pos1:>5}: {self.tasks[pos1 - 1]['cmd']}\n"
+                                              f"{pos2:>5}: {self.tasks[pos2 - 1]['cmd']}\n")
                     else: logger.logger.error("Error saving tasks after swap.")
             else: logger.logger.error("Failed to load tasks. Please check the tasker file.")
         except Exception as e:
@@ -684,22 +931,20 @@ class Operator:
                     logger.logger.error(f"Task keys are not ordered. Please run `tasker.py {tasker_id} fix` to fix it.")
                 
                 else:
-                    tasks_to_remove = [k for k, v in self.tasks.items() if v['status'] in status]
+                    tasks_to_remove = [i for i, v in enumerate(self.tasks, 1) if v['status'] in status]
                     if not tasks_to_remove:
                         logger.logger.info("No tasks with specific status found.")
                     else:
                         print(f"{len(tasks_to_remove)} tasks:")
-                        for task_id in tasks_to_remove: print(f"  `{self.tasks[task_id]['cmd']}`")
+                        for task_id in tasks_to_remove: print(f"  `{self.tasks[task_id - 1]['cmd']}`")
                         confirm = confirm_input("will be removed. Are you sure you want to remove them? (y/n): ").strip().lower()
                         if confirm == 'y':
-                            cleared = []
-                            for task_id in reversed(tasks_to_remove):
-                                if self.remove_task(int(task_id)):
-                                    cleared.append(task_id)
-                                else: logger.logger.error(f"Error removing task {task_id}.")
+                            # One filtering pass instead of shifting the list once per removed task
+                            self.tasks = [v for v in self.tasks if v['status'] not in status]
+                            self.n_tasks = len(self.tasks)
                             if self.save():
-                                logger.divider.write(f"Cleared {len(cleared)} tasks: " 
-                                                     f"{', '.join(reversed(cleared))}.")
+                                logger.divider.write(f"Cleared {len(tasks_to_remove)} tasks: " 
+                                                     f"{', '.join(map(str, tasks_to_remove))}.")
                             else: logger.logger.error("Error saving tasks after clearing.")
                         else: logger.logger.info(f"Canceled clearing tasks with specific status.")
             else: logger.logger.error("Failed to load tasks. Please check the tasker file.")
@@ -721,14 +966,13 @@ class Operator:
                 if self.check_valid_tasks():
                     logger.logger.info("Task keys are already ordered.")
                 else:
-                    task_ids = sorted(self.tasks.keys(), key=int)
-                    if len(task_ids) == self.n_tasks:
-                        new_tasks = {str(i): self.tasks[task_ids[i - 1]] 
-                                    for i in range(1, self.n_tasks + 1)}
-                        self.tasks = new_tasks
+                    order = sorted(range(len(self.task_keys)), key=lambda i: int(self.task_keys[i]))
+                    if len(order) == self.n_tasks:
+                        self.tasks = [self.tasks[i] for i in order]
+                        self.task_keys = [str(i) for i in range(1, self.n_tasks + 1)]
                         if self.save():
                             logger.divider.write(f"Fixed task keys. Now they are ordered: "
-                                                 f"{', '.join(self.tasks.keys())}.")
+                                                 f"{', '.join(self.task_keys)}.")
                         else: logger.logger.error("Error saving tasks after fixing.")
                     else: logger.logger.error("Failed to fix task keys. Number of task IDs and tasks not match.")
             else: logger.logger.error("Failed to load tasks. Please check the tasker file.")
@@ -737,7 +981,7 @@ class Operator:
         finally:
             logger.divider.word_line("fix")
 
-def get_table_content(tasks: dict) -> str:
+def get_table_content(tasks: List[dict]) -> str:
     td_class = {"completed": "success", "failed": "error", "running": "warning", "pending": "warning"}
     table_content = """
         <div class="table-container">
@@ -753,11 +997,11 @@ def get_table_content(tasks: dict) -> str:
             <tbody>
     """
     
-    for task_id, task_info in tasks.items():
+    for task_id, task_info in enumerate(tasks, 1):
         if not all (k in task_info.keys() for k in ["status", "cmd", "wd"]):
             raise ValueError("Each item in JSON must contain 'status', 'cmd', and 'wd' keys")
         if not task_info['status'] in ["completed", "failed"]:
-            if task_info['status'] in ["running", "pending"]:
+            if task_info['status'] in ACTIVE_STATUSES:
                 raise Warning("Status NOT 'completed' or 'failed'")
             raise ValueError(f"Invalid status: {task_info['status']}")
         
@@ -778,83 +1022,80 @@ def get_table_content(tasks: dict) -> str:
     return table_content
 
 
+def input_position(prompt: str) -> int:
+    return int(input(f"{prompt}: "))
+
+def input_work_dir() -> str:
+    return input(f"Work directory: (default '.') ").strip() or CWD_PATH
+
+def mode_add(operator: Operator):
+    command = input("Command: ").strip()
+    operator.append(command, input_work_dir())
+
+def mode_insert(operator: Operator):
+    position = input_position("Position to insert at")
+    command = input("Command: ").strip()
+    operator.insert(position, command, input_work_dir())
+
+def mode_move(operator: Operator):
+    pos = input_position("Position to move")
+    operator.move(pos, input_position("Target position"))
+
+def mode_swap(operator: Operator):
+    pos1 = input_position("Position 1 to swap")
+    operator.swap(pos1, input_position("Position 2 to swap"))
+
+def mode_clear(operator: Operator):
+    status_str = input("Status to clear: p - pending, \n"
+                       "                 c - completed, \n"
+                       "                 f - failed. \n"
+                       "(default is c): ").strip().lower() or "c"
+    status = []
+    if "p" in status_str: status.append("pending")
+    if "c" in status_str: status.append("completed")
+    if "f" in status_str: status.append("failed")
+    operator.clear(status)
+
+def mode_help(operator: Operator):
+    print("Available modes:")
+    print("  run       - Run all pending tasks")
+    print("  pause     - Pause the tasker")
+    print("  resume    - Resume the tasker")
+    print("  ls        - List all pending tasks")
+    print("  la        - List all tasks")
+    print("  add       - Add a new task")
+    print("  in        - Insert a task at a specific position")
+    print("  rm        - Remove a task at a specific position")
+    print("  mv        - Move a task to a different position")
+    print("  rerun     - Rerun a task at a specific position")
+    print("  swap      - Swap two tasks at specified positions")
+    print("  clr       - Clear tasks with specific status")
+    print("  fix       - Fix task keys to be ordered")
+
+# Mode name: function called with the Operator
+MODE_HANDLERS = {
+    "run": lambda operator: operator.run(),
+    "pause": lambda operator: operator.pause(),
+    "resume": lambda operator: operator.resume(),
+    "ls": lambda operator: operator.list(only_pending=True),
+    "la": lambda operator: operator.list(only_pending=False),
+    "add": mode_add,
+    "in": mode_insert,
+    "rm": lambda operator: operator.remove(input_position("Position to remove")),
+    "mv": mode_move,
+    "rerun": lambda operator: operator.rerun(input_position("Position to rerun")),
+    "swap": mode_swap,
+    "clr": mode_clear,
+    "fix": lambda operator: operator.fix(),
+    "help": mode_help,
+}
+
 def main(args):
-    operator = Operator(args.tasker_id)
+    operator = Operator(args.tasker_id, jobs=args.jobs)
 
-    if args.mode == "run":
-        operator.run()
-    
-    elif args.mode == "pause":
-        operator.pause()
-    
-    elif args.mode == "resume":
-        operator.resume()
-    
-    elif args.mode == "ls":
-        operator.list(only_pending=True)
-    
-    elif args.mode == "la":
-        operator.list(only_pending=False)
-    
-    elif args.mode == "add":
-        command = input("Command: ").strip()
-        work_dir = input(f"Work directory: (default '.') ").strip() or CWD_PATH
-        operator.append(command, work_dir)
-    
-    elif args.mode == "in":
-        position = int(input("Position to insert at: "))
-        command = input("Command: ").strip()
-        work_dir = input(f"Work directory: (default '.') ").strip() or CWD_PATH
-        operator.insert(position, command, work_dir)
-    
-    elif args.mode == "rm":
-        position = int(input("Position to remove: "))
-        operator.remove(position)
-
-    elif args.mode == "mv":
-        pos = int(input("Position to move: "))
-        target_pos = int(input("Target position: "))
-        operator.move(pos, target_pos)
-    
-    elif args.mode == "rerun":
-        position = int(input("Position to rerun: "))
-        operator.rerun(position)
-
-    elif args.mode == "swap":
-        pos1 = int(input("Position 1 to swap: "))
-        pos2 = int(input("Position 2 to swap: "))
-        operator.swap(pos1, pos2)
-    
-    elif args.mode == "clr":
-        status_str = input("Status to clear: p - pending, \n"
-                           "                 c - completed, \n"
-                           "                 f - failed. \n"
-                           "(default is c): ").strip().lower() or "c"
-        status = []
-        if "p" in status_str: status.append("pending")
-        if "c" in status_str: status.append("completed")
-        if "f" in status_str: status.append("failed")
-        operator.clear(status)
-    
-    elif args.mode == "fix":
-        operator.fix()
-    
-    elif args.mode == "help":
-        print("Available modes:")
-        print("  run       - Run all pending tasks")
-        print("  pause     - Pause the tasker")
-        print("  resume    - Resume the tasker")
-        print("  ls        - List all pending tasks")
-        print("  la        - List all tasks")
-        print("  add       - Add a new task")
-        print("  in        - Insert a task at a specific position")
-        print("  rm        - Remove a task at a specific position")
-        print("  mv        - Move a task to a different position")
-        print("  rerun     - Rerun a task at a specific position")
-        print("  swap      - Swap two tasks at specified positions")
-        print("  clr       - Clear tasks with specific status")
-        print("  fix       - Fix task keys to be ordered")
-    
+    handler = MODE_HANDLERS.get(args.mode)
+    if handler is not None:
+        handler(operator)
     else:
         logger.logger.error(f"Unknown mode: {args.mode}")
 
@@ -862,5 +1103,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Simple queue-based task runner.")
     parser.add_argument("tasker_id", type=str, help="Tasker ID to identify the task queue")
     parser.add_argument("mode", type=str, help="Execute mode")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Max number of tasks to run at once (run mode)")
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
     main(args)
\ No newline at end of file
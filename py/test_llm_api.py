@@ -1,5 +1,6 @@
 # `python ~/my/test_llm_api.py <base url> <model>`
 import argparse
+import functools
 import json
 import os
 import sys
@@ -17,6 +18,11 @@ def load_api_key(key_name: str, env_file: str=None) -> str:
         load_dotenv(dotenv_path=env_file)
     return os.getenv(key_name)
 
+@functools.lru_cache(maxsize=None)
+def get_client(base_url: str, api_key: str) -> OpenAI:
+    """ One client per endpoint and key, so repeated calls reuse its open connections. """
+    return OpenAI(api_key=api_key, base_url=base_url)
+
 def main(args):
     key_name = args.keyname or "OPENAI_API_KEY"
     env_file = Path(args.env) if args.env is not None else (
@@ -35,25 +41,37 @@ def main(args):
         return 1
     
     try:
-        client = OpenAI(api_key=api_key, base_url=args.base_url)
+        client = get_client(args.base_url, api_key)
         
-        start_time = time.time()
-        response = client.chat.completions.create(
-            model=args.model,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant"},
-                {"role": "user", "content": "Hello! What's your name?"},
-            ],
-            stream=False
-        )
-        end_time = time.time()
+        messages = [
+            {"role": "system", "content": "You are a helpful assistant"},
+            {"role": "user", "content": "Hello! What's your name?"},
+        ]
+        # Monotonic clock: not affected by system clock adjustments during the call
+        start_time = time.monotonic()
+        if args.stream:
+            first_time, parts = None, []
+            for chunk in client.chat.completions.create(model=args.model, messages=messages, stream=True):
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if first_time is None: first_time = time.monotonic()
+                    parts.append(chunk.choices[0].delta.content)
+            end_time = time.monotonic()
+            content = "".join(parts)
+        else:
+            response = client.chat.completions.create(model=args.model, messages=messages, stream=False)
+            end_time = time.monotonic()
+            content = response.choices[0].message.content
 
-        print("\n------ Detailed Response ------")
-        print(json.dumps(response.model_dump(), indent=4, ensure_ascii=False))
+            print("\n------ Detailed Response ------")
+            print(json.dumps(response.model_dump(), indent=4, ensure_ascii=False))
 
         print("\n----------- Summary -----------")
+        if args.stream and first_time is not None:
+            print(f"  First token after {first_time - start_time:.2f} seconds")
+            if end_time > first_time:
+                print(f"  Streamed {len(parts)} chunks at {(len(parts) - 1) / (end_time - first_time):.1f} chunks/s")
         print(f"  API call took {end_time - start_time:.2f} seconds")
-        print(f"{args.model.split('/')[-1]}: {response.choices[0].message.content}")
+        print(f"{args.model.split('/')[-1]}: {content}")
     
     except Exception as e:
         print(f"Error during API call - {e}")
@@ -67,6 +85,7 @@ if __name__ == "__main__":
     parser.add_argument("model", type=str, help="Model to use for the chat completion")
     parser.add_argument("-k", "--key", type=str, default=None, help="API key for test")
     parser.add_argument("--keyname", type=str, default=None, help="Environment variable name for the API key")
+    parser.add_argument("-s", "--stream", action="store_true", help="Stream the response and report the time to first token")
     parser.add_argument("--env", type=str, default=None, help="Path to .env file containing the API key; Require `pip install python-dotenv`")
     args = parser.parse_args()
     sys.exit(main(args))
\ No newline at end of file